@@ -1,4 +1,5 @@
 from .agent import Agent
-from .async_agent import AsyncAgent
+from .async_agent import AsyncAgent, configure_concurrency
+from .cache import LLMCache
 
-__all__ = ['Agent', 'AsyncAgent']
\ No newline at end of file
+__all__ = ['Agent', 'AsyncAgent', 'LLMCache', 'configure_concurrency']
\ No newline at end of file
@@ -1,45 +1,111 @@
 #!/usr/bin/env python3
+import re
 import sys
 import argparse
-import os
+import time
+from functools import lru_cache
+from markdown_it import MarkdownIt
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
+from rich.text import Text
+from openai import APIError
 from .agent import Agent
+from ._console import console
 
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # rich clears in-process, also on legacy Windows consoles without ANSI support
+    console.clear()
+
+@lru_cache(maxsize=64)
+def cached_markdown(text: str) -> Markdown:
+    """Parse text as Markdown, reusing the result for recently seen text"""
+    return Markdown(text)
 
 def print_response(response: str, raw: bool = False, console: Console = None):
     """Print a complete response without streaming"""
     if raw:
         print(response)
     else:
-        md = Markdown(response)
-        console.print(md)
+        console.print(cached_markdown(response))
 
-def process_stream(stream, raw=False, console=None):
-    """Process a stream of text, buffering until we have complete lines"""
-    buffer = ""
+REFRESH_INTERVAL = 0.1  # Minimum seconds between Markdown renders while streaming
+
+# Same parser configuration rich.markdown.Markdown uses
+md_parser = MarkdownIt().enable("strikethrough").enable("table")
+
+# Line breaks as markdown-it counts them, a lone \r is one too
+_LINE_BREAK = re.compile(r"\r\n?|\n")
+
+def split_blocks(text: str):
+    """Split text into complete Markdown blocks and the offset of the unstable tail
+
+    Only the last top-level block can still change as more text arrives, so
+    every top-level block before it is complete and safe to render.
+    """
+    starts = [token.map[0] for token in md_parser.parse(text) if token.level == 0 and token.map]
+    if len(starts) < 2:
+        return [], 0
+    line_offsets = [0]
+    for _ in range(starts[-1]):  # Only the lines before the tail are needed
+        line_offsets.append(_LINE_BREAK.search(text, line_offsets[-1]).end())
+    blocks = [text[line_offsets[a]:line_offsets[b]] for a, b in zip(starts, starts[1:])]
+    return blocks, line_offsets[starts[-1]]
+
+def _raw_stream(stream, console=None):
+    """Write a stream of text to stdout as it arrives"""
+    write = sys.stdout.write
+    flush = sys.stdout.flush
     for chunk in stream:
         if chunk:
-            if raw:
-                print(chunk, end='')
-                sys.stdout.flush()
-            else:
-                buffer += chunk
-                lines = buffer.splitlines(True)  # Keep line endings
-                if len(lines) > 1:  # We have complete lines
-                    for line in lines[:-1]:  # Process all complete lines
-                        if line.strip():  # Skip empty lines
-                            md = Markdown(line)
-                            console.print(md)
-                    buffer = lines[-1]  # Keep partial line in buffer
-    
-    # Process any remaining text
-    if buffer and not raw:
-        md = Markdown(buffer)
-        console.print(md)
+            write(chunk)
+            flush()
+
+def _rich_stream(stream, console):
+    """Render a stream of text as Markdown, rendering each complete block once
+
+    The unfinished trailing block is shown in a live region which is refreshed
+    at most once every REFRESH_INTERVAL seconds.
+    """
+    buffer = ""
+    buffer_parts = []  # Chunks received since the last tick
+    scan_pos = 0  # Buffer position already searched for a newline
+    last_flush = time.monotonic()
+    with Live(console=console, auto_refresh=False) as live:
+        for chunk in stream:
+            if not chunk:
+                continue
+            buffer_parts.append(chunk)
+            now = time.monotonic()
+            if now - last_flush < REFRESH_INTERVAL:  # Just buffer between ticks
+                continue
+            last_flush = now
+            text = "".join(buffer_parts)
+            buffer_parts.clear()
+            if text.endswith('\r'):  # Could be the first half of a \r\n, wait for the next chunk
+                buffer_parts.append('\r')
+                text = text[:-1]
+            buffer += _LINE_BREAK.sub('\n', text)
+            # Blocks can only complete at a line end, so skip parsing until one arrives
+            if buffer.find('\n', scan_pos) != -1:
+                blocks, stable_offset = split_blocks(buffer)
+                for block in blocks:
+                    live.console.print(cached_markdown(block))  # Printed above the live region
+                buffer = buffer[stable_offset:]  # Keep the unstable tail
+            scan_pos = len(buffer)
+            live.update(Markdown(buffer), refresh=True)
+
+        # Process any remaining text
+        buffer += _LINE_BREAK.sub('\n', "".join(buffer_parts))
+        blocks, stable_offset = split_blocks(buffer)
+        for block in blocks:
+            live.console.print(cached_markdown(block))
+        live.update(Markdown(buffer[stable_offset:]), refresh=True)
+
+def process_stream(stream, raw=False, console=None):
+    """Process a stream of text, either raw or rendered as Markdown"""
+    (_raw_stream if raw else _rich_stream)(stream, console)
 
 def main():
     parser = argparse.ArgumentParser(description="Simple OpenAI chat client")
@@ -86,25 +152,22 @@ def main():
         print("Error: Temperature must be between 0 and 2", file=sys.stderr)
         sys.exit(1)
     
-    console = Console()
-    
     # Convert environment prefix to uppercase if provided
     env_prefix = args.env.upper() if args.env else None
     agent = Agent(args.system, temperature=args.temperature, tenant_prefix=env_prefix)
     
     if args.prompt is None:  # Chat mode
         def print_config(agent):
-            console.print("\nModel: ", style="blue", end='')
-            console.print(agent.model, style="green")
-            console.print("Temperature: ", style="blue", end='')
-            console.print(f"{agent.temperature}", style="green", end='')
-            console.print(" [dim]⟨0.0-2.0⟩[/dim]", style="blue")
-            console.print("System: ", style="blue", end='')
-            console.print(agent.system_prompt or 'No system prompt set', style="green")
+            console.print(Text.assemble(
+                ("\nModel: ", "blue"), (agent.model, "green"),
+                ("\nTemperature: ", "blue"), (f"{agent.temperature}", "green"),
+                (" ⟨0.0-2.0⟩", "blue dim"),
+                ("\nSystem: ", "blue"), (agent.system_prompt or 'No system prompt set', "green"),
+            ))
         
         def reset_conversation(new_system=None):
             clear_screen()
-            return Agent(new_system or args.system, temperature=args.temperature, tenant_prefix=env_prefix)
+            agent.reset(new_system or args.system)
         
         print_config(agent)
         console.print("\nStarting chat session. Commands:")
@@ -123,7 +186,7 @@ def main():
                 if user_input.startswith("/reset"):
                     # Extract new system prompt if provided
                     new_system = user_input[6:].strip() if len(user_input) > 6 else None
-                    agent = reset_conversation(new_system)
+                    reset_conversation(new_system)
                     print_config(agent)
                     if new_system:
                         console.print("\nConversation reset with new system prompt.")
@@ -135,7 +198,10 @@ def main():
                 
                 response = agent.request(user_input, stream=args.stream)
                 if args.stream:
-                    process_stream(response, args.raw, console)
+                    try:
+                        process_stream(response, args.raw, console)
+                    except APIError as e:  # Reported by the server midway through the answer
+                        console.print(f"\nError: {e}")
                 else:
                     print_response(response, args.raw, console)
             
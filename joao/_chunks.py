@@ -0,0 +1,57 @@
+"""Grouping of streamed tokens into chunks, shared by Agent and AsyncAgent."""
+import time
+from typing import Optional, Iterator, AsyncIterator
+
+class ChunkBatcher:
+    """Join tokens into chunks of at least batch_chars characters, or whatever
+    arrived within batch_ms milliseconds of the chunk's first token."""
+
+    def __init__(self, batch_chars: int, batch_ms: float):
+        self.batch_chars = batch_chars
+        self.batch_seconds = batch_ms / 1000
+        self._parts = []
+        self._size = 0
+        self._deadline = None
+
+    def add(self, token: str) -> Optional[str]:
+        """Add a token, returning the chunk when it is complete"""
+        self._parts.append(token)
+        self._size += len(token)
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now + self.batch_seconds
+        if self._size >= self.batch_chars or now >= self._deadline:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Get whatever is left of the current chunk, None if it is empty"""
+        if not self._parts:
+            return None
+        chunk = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        self._deadline = None
+        return chunk
+
+def batch_chunks(tokens: Iterator[str], batch_chars: int, batch_ms: float) -> Iterator[str]:
+    """Group the tokens of a stream, see ChunkBatcher"""
+    batcher = ChunkBatcher(batch_chars, batch_ms)
+    for token in tokens:
+        chunk = batcher.add(token)
+        if chunk is not None:
+            yield chunk
+    chunk = batcher.flush()
+    if chunk is not None:
+        yield chunk
+
+async def abatch_chunks(tokens: AsyncIterator[str], batch_chars: int, batch_ms: float) -> AsyncIterator[str]:
+    """Group the tokens of an async stream, see ChunkBatcher"""
+    batcher = ChunkBatcher(batch_chars, batch_ms)
+    async for token in tokens:
+        chunk = batcher.add(token)
+        if chunk is not None:
+            yield chunk
+    chunk = batcher.flush()
+    if chunk is not None:
+        yield chunk
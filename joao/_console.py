@@ -0,0 +1,6 @@
+"""Shared rich console for joao."""
+from rich.console import Console
+
+# Console() probes the terminal (tty, encoding, colors, size), so do it once.
+# Repr highlighting is off since output is either Markdown or explicitly styled.
+console = Console(highlight=False)
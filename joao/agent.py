@@ -1,18 +1,104 @@
+import copy
+import threading
 from os import getenv
-from openai import OpenAI
-from typing import Optional, List, Callable, Union, Iterator, Any
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from openai import OpenAI, APIError
+from typing import Optional, List, Callable, Union, Iterator, Any, Dict
 from .tools import ToolsHandler
+from .cache import LLMCache
+from .batch import BatchProcessor, DEFAULT_POLL_INTERVAL
 from .debug import debug_print, is_debug_enabled
-import json
-from rich.console import Console
+from ._console import console
+from ._chunks import batch_chunks
+
+try:
+    import orjson as _json  # Optional, several times faster on large payloads
+except ImportError:
+    import json as _json
 
 DEFAULT_MODEL = "gemini-2.0-flash"
 DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+OPENAI_API_HOST = "api.openai.com"
+DEFAULT_MAX_HISTORY_MESSAGES = 40
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+def _get_shared_client(api_key: str, base_url: str) -> OpenAI:
+    """Get the OpenAI client for these credentials, creating it on first use.
+
+    Agents talking to the same endpoint share one client, and with it the
+    connection pool, instead of each doing its own TCP/TLS setup.
+    """
+    key = (OpenAI, api_key, base_url)  # OpenAI too, so patching it in tests gets a new client
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = OpenAI(api_key=api_key, base_url=base_url)
+        return client
+
+def _message_role(message: Any) -> str:
+    """Get the role of a history entry, either a dict or a ChatCompletionMessage."""
+    return message["role"] if isinstance(message, dict) else message.role
+
+def _awaits_tool_results(messages: List[Any]) -> bool:
+    """Whether the history ends with an assistant message requesting tool calls."""
+    if not messages:
+        return False
+    last = messages[-1]
+    if isinstance(last, dict):
+        return last["role"] == "assistant" and bool(last.get("tool_calls"))
+    return last.role == "assistant" and bool(last.tool_calls)
 
-console = Console()
+def _tool_call_dict(tool_call: Any) -> Dict[str, Any]:
+    """Convert a tool call from a model response to a plain dict."""
+    return {
+        "id": tool_call.id,
+        "type": "function",
+        "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
+    }
+
+def _assistant_message(message: Any) -> Dict[str, Any]:
+    """Convert a ChatCompletionMessage to the plain dict kept in the history.
+
+    The client turns model objects back into dicts every time the history is
+    sent, converting once keeps that work out of every later turn.
+    """
+    entry = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        entry["tool_calls"] = [_tool_call_dict(tool_call) for tool_call in message.tool_calls]
+    return entry
+
+def _iter_sse_content(lines: Iterator[str], request: Any = None) -> Iterator[str]:
+    """Yield the delta content carried by chat completion SSE lines.
+
+    Raises:
+        APIError: If the server reports an error in the middle of the stream
+    """
+    for line in lines:
+        if not line.startswith("data: "):
+            continue
+        data = line[6:]
+        if data == "[DONE]":
+            break
+        payload = _json.loads(data)
+        error = payload.get("error")
+        if error:
+            # Same handling as the SDK's Stream, the answer so far is incomplete
+            message = error.get("message") if isinstance(error, dict) else None
+            if not message or not isinstance(message, str):
+                message = "An error occurred during streaming"
+            raise APIError(message, request, body=error)
+        choices = payload.get("choices")
+        if not choices:
+            continue
+        content = choices[0]["delta"].get("content")
+        if content is not None:
+            yield content
 
 class Agent:
-    def __init__(self, system_prompt: str = None, temperature: float = 0, tenant_prefix: str = None, debug: bool = False, api_key: str = None):
+    def __init__(self, system_prompt: str = None, temperature: float = 0, tenant_prefix: str = None, debug: bool = False, api_key: str = None, max_history_messages: Optional[int] = DEFAULT_MAX_HISTORY_MESSAGES, cache: Optional[LLMCache] = None, concurrent_tool_calls: bool = True, responses_api: bool = False):
         """Initialize the agent with optional system prompt and tenant prefix.
         
         Args:
@@ -21,6 +107,14 @@ class Agent:
             tenant_prefix: Optional prefix for environment variables
             debug: Enable debug output
             api_key: Optional API key (if not provided, will look in environment variables)
+            max_history_messages: Maximum number of messages kept after the system prompt,
+                oldest ones are dropped first (None keeps the whole conversation)
+            cache: Optional response cache, only used when temperature is 0
+            concurrent_tool_calls: Run the tool calls of a turn on worker threads,
+                disable it for tools that are not thread safe
+            responses_api: On api.openai.com, send plain turns through the Responses API,
+                which keeps the conversation server side (stored by OpenAI) so each turn
+                only sends the new message
         """
         prefix = f"{tenant_prefix}_" if tenant_prefix else ""
         
@@ -32,16 +126,17 @@ class Agent:
         self.model = getenv(f"{prefix}OPENAI_MODEL", DEFAULT_MODEL)
         self.debug = debug
         
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
+        self.client = _get_shared_client(self.api_key, self.base_url)
         self.system_prompt = system_prompt  # Store the system prompt
-        self.messages = []
-        if system_prompt:
-            self.messages.append({"role": "system", "content": system_prompt})
-        self.tools_handler = ToolsHandler()
+        self._system_msg = {"role": "system", "content": system_prompt} if system_prompt else None
+        self.messages = [self._system_msg] if system_prompt else []
+        self.tools_handler = ToolsHandler(concurrent_calls=concurrent_tool_calls)
         self.temperature = temperature
+        self.max_history_messages = max_history_messages
+        self.cache = cache
+        self.responses_api = responses_api
+        self._use_responses_api = self._responses_api_available()
+        self._last_response_id = None
 
     def debug_print(self, *args, component='agent'):
         """Print debug information with the appropriate prefix"""
@@ -50,6 +145,28 @@ class Agent:
         elif component == 'agent' and is_debug_enabled('agent'):
             print("[DEBUG AGENT]", *args)
 
+    def reset(self, system_prompt: Optional[str] = None):
+        """Clear the conversation, keeping the system prompt unless a new one is given.
+        
+        Args:
+            system_prompt: Optional new system prompt
+        """
+        if system_prompt and system_prompt != self.system_prompt:
+            self.system_prompt = system_prompt
+            self._system_msg = {"role": "system", "content": system_prompt}
+            self.messages[:] = [self._system_msg]
+        else:
+            # Truncate in place, the system message dict is reused as is
+            del self.messages[1 if self._system_msg else 0:]
+        self.tools_handler.clear_tool_calls()
+        # A new server side conversation can be started again
+        self._use_responses_api = self._responses_api_available()
+        self._last_response_id = None
+
+    def _responses_api_available(self) -> bool:
+        """Whether the Responses API was asked for and the endpoint provides it"""
+        return self.responses_api and urlparse(self.base_url).hostname == OPENAI_API_HOST
+
     def request(
         self, 
         message: str, 
@@ -68,7 +185,9 @@ class Agent:
         Returns:
             Union[str, Iterator[str]]: The model's response as a string or token iterator
         """
-        if is_debug_enabled('sent'):
+        dbg_sent = is_debug_enabled('sent')
+        dbg_agent = is_debug_enabled('agent')
+        if dbg_sent:
             self.debug_print("======= Sending message to model", component='sent')
             if self.system_prompt:
                 self.debug_print("System prompt:", component='sent')
@@ -78,10 +197,10 @@ class Agent:
             if tools:
                 self.debug_print("Tools:", component='sent')
                 for tool in tools:
-                    self.debug_print(f"- {tool.__name__}", component='sent')
+                    self.debug_print("-", tool.__name__, component='sent')
             self.debug_print("======= End of message", component='sent')
 
-        if is_debug_enabled('agent'):
+        if dbg_agent:
             self.debug_print("Making API call to:", self.base_url)
             self.debug_print("Model:", self.model)
             self.debug_print("Message:", message)
@@ -96,106 +215,337 @@ class Agent:
         tools_definitions = self.tools_handler.get_tools_definitions()
         
         # Add user message
+        self._trim_history()
         self.messages.append({"role": "user", "content": message})
         
         try:
-            if is_debug_enabled('agent'):
+            cache_key = None
+            if self.cache is not None and self.temperature == 0 and not stream:
+                cache_key = LLMCache.make_key(
+                    self.model, self.messages, self.tools_handler.get_tools_digest() if tools else None,
+                    self.temperature
+                )
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    if dbg_agent:
+                        self.debug_print("Using cached response")
+                    self.messages.append({"role": "assistant", "content": cached})
+                    # The server side conversation would miss this turn
+                    self._use_responses_api = False
+                    return cached
+
+            if dbg_agent:
                 self.debug_print("Sending request to model...")
                 
+            if self._use_responses_api:
+                if not stream and not tools:
+                    content = self._responses_request(message)
+                    if cache_key is not None and content is not None:
+                        self.cache.set(cache_key, content)
+                    return content
+                # The server side conversation would miss this turn, keep using chat completions
+                self._use_responses_api = False
+
+            if stream:
+                # Raw SSE lines skip building a ChatCompletionChunk model per token
+                return self._stream_response(self._open_stream(
+                    self.client.chat.completions.with_streaming_response.create(
+                        model=self.model,
+                        messages=self.messages,
+                        tools=tools_definitions if tools else None,
+                        stream=True,
+                        n=1,
+                        temperature=self.temperature,
+                    )
+                ))
+
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=self.messages,
                 tools=tools_definitions if tools else None,
-                stream=stream,
                 n=1,
                 temperature=self.temperature,
             )
             
-            if is_debug_enabled('agent'):
+            if dbg_agent:
                 self.debug_print("Received response from model")
             
-            if stream:
-                return self._stream_response(response)
-                
             answer = response.choices[0].message
-            self.messages.append(answer)
+            self.messages.append(_assistant_message(answer))
             
             has_content = answer.content is not None and answer.content.strip() != ""
             has_tool_calls = hasattr(answer, 'tool_calls') and answer.tool_calls
             
-            if is_debug_enabled('sent'):
+            if dbg_sent:
                 self.debug_print("======= Model Response =======", component='sent')
                 if has_content:
-                    self.debug_print(f"Content: {answer.content}", component='sent')
+                    self.debug_print("Content:", answer.content, component='sent')
                 if has_tool_calls:
-                    self.debug_print(f"Tool calls requested: {len(answer.tool_calls)}", component='sent')
+                    self.debug_print("Tool calls requested:", len(answer.tool_calls), component='sent')
                     for tc in answer.tool_calls:
-                        self.debug_print(f"Tool: {tc.function.name}", component='sent')
-                        self.debug_print(f"Arguments: {tc.function.arguments}", component='sent')
+                        self.debug_print("Tool:", tc.function.name, component='sent')
+                        self.debug_print("Arguments:", tc.function.arguments, component='sent')
                 self.debug_print("======= End Model Response =======", component='sent')
             
             if has_tool_calls:
-                if is_debug_enabled('agent'):
+                if dbg_agent:
                     self.debug_print("Model requested tool calls:", len(answer.tool_calls))
                 self.tools_handler.set_tool_calls(answer.tool_calls)
                 if auto_use_tools:
-                    if is_debug_enabled('agent'):
+                    if dbg_agent:
                         self.debug_print("Auto-executing tool calls...")
                     tool_response = self.use_tools(auto_update=True)
                     if has_content:
                         return f"{answer.content}\n\n{tool_response}"
                     return tool_response
+            elif cache_key is not None and answer.content is not None:
+                # Only plain answers are cached, tool calls must run every time
+                self.cache.set(cache_key, answer.content)
             
             return answer.content
             
         except Exception as e:
-            if is_debug_enabled('agent'):
-                self.debug_print(f"Error in request: {str(e)}")
+            if dbg_agent:
+                self.debug_print("Error in request:", e)
             return f"Error: {str(e)}"
 
-    def _stream_response(self, response_stream):
-        """Process streaming response and yield tokens."""
+    def stream(
+        self,
+        message: str,
+        tools: Optional[List[Callable]] = None,
+        batch_chars: int = 64,
+        batch_ms: float = 50
+    ) -> Iterator[str]:
+        """Send a message and yield the response in small chunks as it arrives.
+        
+        Tokens are grouped so callers are not woken up once per token.
+        
+        Args:
+            message: The message to send
+            tools: Optional list of callable functions to be used as tools
+            batch_chars: Yield a chunk once it has at least this many characters
+            batch_ms: Yield a chunk once its first token is this many milliseconds old
+        
+        Yields:
+            str: The next chunk of the response
+        """
+        response = self.request(message, tools=tools, stream=True)
+        if isinstance(response, str):  # The request could not be sent, this is the error message
+            yield response
+            return
+        try:
+            yield from batch_chunks(response, batch_chars, batch_ms)
+        except APIError as e:
+            # An error event in the middle of the stream, reported like a failed request
+            yield f"Error: {str(e)}"
+
+    def request_batch(
+        self,
+        prompts: List[str],
+        tools: Optional[List[Callable]] = None,
+        max_workers: int = 8
+    ) -> List[str]:
+        """Send independent prompts concurrently, each in its own conversation.
+        
+        The prompts only share the system prompt, this agent's history is left untouched.
+        
+        Args:
+            prompts: The messages to send
+            tools: Optional list of callable functions to be used as tools
+            max_workers: Maximum number of requests in flight at the same time
+        
+        Returns:
+            List[str]: The model's responses, in the same order as the prompts
+        """
+        if not prompts:
+            return []
         if is_debug_enabled('agent'):
-            self.debug_print("Starting to stream response...")
+            self.debug_print("Sending a batch of", len(prompts), "prompts")
+
+        # Build the tool definitions once, every request then finds them already set
+        tools_handler = self.tools_handler.fork()
+        tools_handler.set_tools(tools)
+
+        def run(prompt):
+            return self._fork(tools_handler.fork()).request(prompt, tools=tools)
+
+        # The requests are I/O bound, threads overlap their round trips (map keeps the order)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            return list(executor.map(run, prompts))
+
+    def submit_batch(self, prompts: List[str], tools: Optional[List[Callable]] = None) -> str:
+        """Submit independent prompts to the provider's Batch API.
+        
+        Each prompt is sent in its own conversation with the system prompt. Batches
+        are cheaper than regular requests but can take up to a day to complete.
+        Tools are only described to the model, their calls are not executed.
+        
+        Args:
+            prompts: The messages to send
+            tools: Optional list of callable functions to be offered as tools
+        
+        Returns:
+            str: The batch id, to be passed to fetch_batch
+        """
+        tools_handler = self.tools_handler.fork()
+        tools_handler.set_tools(tools)
+        system = [self._system_msg] if self._system_msg else []
+        return BatchProcessor(self.client, self.model).submit(
+            [system + [{"role": "user", "content": prompt}] for prompt in prompts],
+            tools=tools_handler.get_tools_definitions() or None,
+            temperature=self.temperature,
+        )
+
+    def fetch_batch(self, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL) -> List[Optional[str]]:
+        """Wait for a batch submitted with submit_batch and get its responses.
+        
+        Args:
+            batch_id: The id returned by submit_batch
+            poll_interval: Seconds between status checks while the batch is processed
+        
+        Returns:
+            List[Optional[str]]: The responses in prompt order, None for failed requests
+        """
+        processor = BatchProcessor(self.client, self.model)
+        batch = processor.wait(batch_id, poll_interval=poll_interval)
+        results = processor.results(batch)
+        count = batch.request_counts.total if batch.request_counts else len(results)
+        return [results.get(f"request-{i}") for i in range(count)]
+
+    def _fork(self, tools_handler: ToolsHandler) -> "Agent":
+        """Get an agent sharing this one's client and settings, with a new conversation."""
+        agent = copy.copy(self)
+        agent.messages = [self._system_msg] if self._system_msg else []
+        agent.tools_handler = tools_handler
+        agent._last_response_id = None
+        return agent
+
+    def _trim_history(self):
+        """Drop the oldest messages so the history, including the next user message,
+        stays within max_history_messages."""
+        if not self.max_history_messages:
+            return
+        first = 1 if self.system_prompt else 0  # The system prompt is always kept
+        cut = len(self.messages) + 1 - self.max_history_messages
+        if cut <= first:
+            return
+        # Start the kept history on a user message so no tool result loses its call
+        while cut < len(self.messages) and _message_role(self.messages[cut]) != "user":
+            cut += 1
+        if is_debug_enabled('agent'):
+            self.debug_print("Dropping", cut - first, "old messages from the conversation")
+        del self.messages[first:cut]
+        # The server side conversation still holds the dropped messages, start a new one
+        self._last_response_id = None
+
+    def _responses_request(self, message: str) -> str:
+        """Send only the new message, continuing the server side conversation.
+        
+        A new server side conversation (first turn, or after the history was trimmed)
+        starts from the local history, so it holds no more than max_history_messages.
+        
+        Args:
+            message: The message to send
             
-        for chunk in response_stream:
-            if chunk.choices[0].delta.content is not None:
-                if is_debug_enabled('agent'):
-                    self.debug_print("Received chunk:", chunk.choices[0].delta.content)
-                yield chunk.choices[0].delta.content
-                
+        Returns:
+            str: The model's response
+        """
+        kwargs = {}
+        if self.system_prompt:
+            kwargs["instructions"] = self.system_prompt  # Not carried over between responses
+        input = message
+        if self._last_response_id:
+            kwargs["previous_response_id"] = self._last_response_id
+        else:
+            # Only plain user and assistant turns go through here, tools and streams fall back
+            history = self.messages[1 if self._system_msg else 0:]
+            if len(history) > 1:
+                input = [{"role": entry["role"], "content": entry["content"]} for entry in history]
         if is_debug_enabled('agent'):
+            self.debug_print("Using Responses API, previous response:", self._last_response_id)
+
+        response = self.client.responses.create(
+            model=self.model,
+            input=input,
+            temperature=self.temperature,
+            **kwargs,
+        )
+        self._last_response_id = response.id
+        # Keep the local history complete in case we fall back to chat completions
+        self.messages.append({"role": "assistant", "content": response.output_text})
+        return response.output_text
+
+    @staticmethod
+    def _open_stream(streaming_response):
+        """Send a streaming request and get its open response.
+        
+        with_streaming_response only sends the request when entered, doing it here
+        lets HTTP errors reach the caller's error handling instead of surfacing on
+        the first iteration of the token generator.
+        """
+        return streaming_response.__enter__()
+
+    def _stream_response(self, response):
+        """Read raw SSE lines from an open streaming response and yield content tokens."""
+        dbg_agent = is_debug_enabled('agent')
+        if dbg_agent:
+            self.debug_print("Starting to stream response...")
+
+        content_parts = []
+        try:
+            contents = _iter_sse_content(response.iter_lines(), response.http_request)
+            # Pick the loop once instead of testing the debug flag per token
+            if dbg_agent:
+                for content in contents:
+                    self.debug_print("Received chunk:", content)
+                    content_parts.append(content)
+                    yield content
+            else:
+                for content in contents:
+                    content_parts.append(content)
+                    yield content
+        finally:
+            response.close()  # Also when the stream fails midway
+
+        # After streaming is done, add the complete message to history
+        self.messages.append({"role": "assistant", "content": "".join(content_parts)})
+                
+        if dbg_agent:
             self.debug_print("Finished streaming response")
 
-    def use_tools(self, auto_update=True):
+    def use_tools(self, auto_update=True, stream=False):
         """Execute all pending tool calls and optionally get model's response
         
         Args:
             auto_update (bool): If True, adds tool responses to messages and gets model's response
+            stream (bool): If True, stream the model's response to the tool results
         
         Returns:
-            str: The model's response if auto_update=True, otherwise the tool response
+            Union[str, Iterator[str]]: The model's response if auto_update=True (a token
+            iterator when streaming), otherwise the tool response
         """
         if not self.tools_handler.has_pending_calls():
             return None
 
-        if is_debug_enabled('agent'):
+        dbg_sent = is_debug_enabled('sent')
+        dbg_agent = is_debug_enabled('agent')
+        if dbg_agent:
             self.debug_print("Executing tool calls...")
 
         # Always execute all pending tool calls
-        responses = []
         tool_calls = self.tools_handler.get_pending_calls()
-        for tool_call in tool_calls:
-            response = self.tools_handler.execute_tool_call(tool_call)
-            responses.append(response)
-            
-            if auto_update:
-                # Add assistant's tool call to conversation
+        responses = self.tools_handler.run_tool_calls(tool_calls)
+
+        if auto_update:
+            # request() already stored the assistant message carrying the calls, its tool
+            # results must follow it directly. Calls set by hand get a message of their own.
+            if not _awaits_tool_results(self.messages):
                 self.messages.append({
                     "role": "assistant",
                     "content": "",
-                    "tool_calls": [tool_call]
+                    "tool_calls": [_tool_call_dict(tool_call) for tool_call in tool_calls]
                 })
+            for tool_call, response in zip(tool_calls, responses):
                 # Add tool response to conversation
                 self.messages.append({
                     "role": "tool",
@@ -209,35 +559,50 @@ class Agent:
         
         if auto_update:
             # Get model's response to tool results
-            if is_debug_enabled('agent'):
+            if dbg_agent:
                 self.debug_print("Getting model's response to tool results...")
                 self.debug_print("Messages to send:")
                 for msg in self.messages:
                     self.debug_print(f"[{msg['role']}]: {msg.get('content', '')}")
                     if msg.get('tool_calls'):
-                        self.debug_print(f"  Tool calls: {len(msg['tool_calls'])}")
+                        self.debug_print("  Tool calls:", len(msg['tool_calls']))
                         for tc in msg['tool_calls']:
-                            self.debug_print(f"  - {tc.function.name}: {tc.function.arguments}")
+                            self.debug_print(f"  - {tc['function']['name']}: {tc['function']['arguments']}")
                     if msg.get('tool_call_id'):
-                        self.debug_print(f"  Tool response for: {msg['tool_call_id']}")
+                        self.debug_print("  Tool response for:", msg['tool_call_id'])
             
+            # The system prompt is already the first message, don't send it twice
+            assert not self.system_prompt or self.messages[0]["role"] == "system"
+            if stream:
+                # Tokens reach the caller as soon as they arrive; tool calls requested
+                # by a streamed answer are not followed up
+                return self._stream_response(self._open_stream(
+                    self.client.chat.completions.with_streaming_response.create(
+                        model=self.model,
+                        messages=self.messages,
+                        stream=True,
+                        n=1,
+                        temperature=self.temperature,
+                    )
+                ))
+
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[{"role": "system", "content": self.system_prompt}] + self.messages,
+                messages=self.messages,
                 n=1,
                 temperature=self.temperature,
             )
             
             answer = response.choices[0].message
-            if is_debug_enabled('sent'):
+            if dbg_sent:
                 self.debug_print("======= Model's Response to Tools =======", component='sent')
                 if answer.content:
-                    self.debug_print(f"Content: {answer.content}", component='sent')
+                    self.debug_print("Content:", answer.content, component='sent')
                 if hasattr(answer, 'tool_calls') and answer.tool_calls:
-                    self.debug_print(f"Tool calls requested: {len(answer.tool_calls)}", component='sent')
+                    self.debug_print("Tool calls requested:", len(answer.tool_calls), component='sent')
                     for tc in answer.tool_calls:
-                        self.debug_print(f"Tool: {tc.function.name}", component='sent')
-                        self.debug_print(f"Arguments: {tc.function.arguments}", component='sent')
+                        self.debug_print("Tool:", tc.function.name, component='sent')
+                        self.debug_print("Arguments:", tc.function.arguments, component='sent')
                 self.debug_print("======= End Response =======", component='sent')
             
             self.messages.append({
@@ -247,7 +612,7 @@ class Agent:
             
             # If model requests more tool calls, handle them recursively
             if hasattr(answer, 'tool_calls') and answer.tool_calls:
-                if is_debug_enabled('agent'):
+                if dbg_agent:
                     self.debug_print("Model requested more tool calls, handling recursively...")
                 self.tools_handler.set_tool_calls(answer.tool_calls)
                 return self.use_tools(auto_update=True)
@@ -265,16 +630,7 @@ class Agent:
         Returns:
             Optional[Callable]: The matching tool function if found, None otherwise
         """
-        if not self.tools_handler.tools:
-            return None
-            
-        tool_name = tool_call.function.name
-        
-        # Find the matching tool function
-        for tool in self.tools_handler.tools:
-            if tool.__name__ == tool_name:
-                return tool
-        return None
+        return self.tools_handler.get_tool(tool_call.function.name)
         
     def tool_exec(self) -> Any:
         """Execute the current tool call with its arguments.
@@ -286,7 +642,7 @@ class Agent:
             return None
             
         tool_call = self.tools_handler.tool_calls[0]
-        args = json.loads(tool_call.function.arguments)
+        args = _json.loads(tool_call.function.arguments)
         
         # Get the tool function we prepared
         tool = self.tools_handler.tools[0]  # Should be set by prepare_call
@@ -1,10 +1,45 @@
+import random
+import asyncio
 from os import getenv
-from openai import AsyncOpenAI
+from weakref import WeakKeyDictionary
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
 from typing import Optional, List, Callable, Union, AsyncIterator
 from .tools import AsyncToolsHandler
+from .agent import _awaits_tool_results
+from ._chunks import abatch_chunks
 
 DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/"
 DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Errors the SDK would retry on its own, retried by _create_completion instead
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+# Requests in flight are limited across all AsyncAgents, with one semaphore per
+# event loop since a semaphore can't be shared between loops
+_max_concurrent_requests = DEFAULT_MAX_CONCURRENT_REQUESTS
+_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+def configure_concurrency(n: int) -> None:
+    """Set how many chat completion requests all AsyncAgents may have in flight at once.
+    
+    Args:
+        n: Maximum number of concurrent requests
+    """
+    global _max_concurrent_requests
+    if n < 1:
+        raise ValueError("The concurrency limit must be at least 1")
+    _max_concurrent_requests = n
+    _semaphores.clear()  # Created again with the new limit on next use
+
+def _request_semaphore() -> asyncio.Semaphore:
+    """Get the request semaphore for the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrent_requests)
+    return semaphore
 
 class AsyncAgent:
     def __init__(self, system_prompt=None, temperature=0.7, tenant_prefix=None, api_key=None):
@@ -25,17 +60,34 @@ class AsyncAgent:
         self.base_url = getenv(f"{prefix}OPENAI_BASE_URL", DEFAULT_BASE_URL)
         self.model = getenv(f"{prefix}OPENAI_MODEL", DEFAULT_MODEL)
         
+        # Retries are left to _create_completion, which backs off outside the
+        # concurrency limit, the SDK retrying too would multiply the attempts
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
+            max_retries=0,
         )
         self.system_prompt = system_prompt  # Store the system prompt
-        self.messages = []
-        if system_prompt:
-            self.messages.append({"role": "system", "content": system_prompt})
+        self._system_msg = {"role": "system", "content": system_prompt} if system_prompt else None
+        self.messages = [self._system_msg] if system_prompt else []
         self.tools_handler = AsyncToolsHandler()
         self.temperature = temperature
 
+    def reset(self, system_prompt: Optional[str] = None):
+        """Clear the conversation, keeping the system prompt unless a new one is given.
+        
+        Args:
+            system_prompt: Optional new system prompt
+        """
+        if system_prompt and system_prompt != self.system_prompt:
+            self.system_prompt = system_prompt
+            self._system_msg = {"role": "system", "content": system_prompt}
+            self.messages[:] = [self._system_msg]
+        else:
+            # Truncate in place, the system message dict is reused as is
+            del self.messages[1 if self._system_msg else 0:]
+        self.tools_handler.clear_tool_calls()
+
     async def request(
         self, 
         message: str, 
@@ -77,9 +129,9 @@ class AsyncAgent:
             }
             
         if stream:
-            return self._stream_response(await self.client.chat.completions.create(**kwargs))
+            return self._stream_response(await self._create_completion(**kwargs))
             
-        response = await self.client.chat.completions.create(**kwargs)
+        response = await self._create_completion(**kwargs)
         answer = response.choices[0].message
         self.messages.append(answer)
         self.tools_handler.set_tool_calls(answer.tool_calls)
@@ -89,17 +141,51 @@ class AsyncAgent:
             
         return answer.content
     
+    async def _create_completion(self, **kwargs):
+        """Create a chat completion within the shared concurrency limit,
+        backing off exponentially on rate limits and transient errors."""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            try:
+                async with _request_semaphore():
+                    return await self.client.chat.completions.create(**kwargs)
+            except _RETRYABLE_ERRORS:
+                if attempt == MAX_RATE_LIMIT_RETRIES - 1:
+                    raise
+            # Wait outside the semaphore so other requests can go ahead
+            await asyncio.sleep(2 ** attempt + random.random())
+
+    async def stream(
+        self,
+        message: str,
+        tools: Optional[List[Callable]] = None,
+        batch_chars: int = 64,
+        batch_ms: float = 50
+    ) -> AsyncIterator[str]:
+        """Send a message and yield the response in small chunks as it arrives.
+        
+        Args:
+            message: The message to send
+            tools: Optional list of callable functions to be used as tools
+            batch_chars: Yield a chunk once it has at least this many characters
+            batch_ms: Yield a chunk once its first token is this many milliseconds old
+        
+        Yields:
+            str: The next chunk of the response
+        """
+        async for chunk in abatch_chunks(await self.request(message, tools=tools, stream=True), batch_chars, batch_ms):
+            yield chunk
+
     async def _stream_response(self, response_stream) -> AsyncIterator[str]:
         """Process streaming response and yield tokens."""
-        collected_message = {"role": "assistant", "content": ""}
+        content_parts = []
         async for chunk in response_stream:
             if chunk.choices[0].delta.content is not None:
                 content = chunk.choices[0].delta.content
-                collected_message["content"] += content
+                content_parts.append(content)
                 yield content
         
         # After streaming is done, add the complete message to history
-        self.messages.append(collected_message)
+        self.messages.append({"role": "assistant", "content": "".join(content_parts)})
     
     async def use_tools(self, autoupdate=True):
         """Execute all pending tool calls
@@ -113,33 +199,35 @@ class AsyncAgent:
         if not self.tools_handler.has_pending_calls():
             return None
             
+        tool_calls = self.tools_handler.get_pending_calls()
         try:
-            tool_response = await self.tools_handler.execute_tool_calls()
+            tool_responses = await self.tools_handler.run_tool_calls(tool_calls)
         except Exception as e:
             print(f"Error executing tool calls: {e}")
             return None
+        self.tools_handler.clear_pending_calls()
             
         if not autoupdate:
             return None
             
-        # Add tool response and get new completion
-        last_tool_calls = self.tools_handler.get_last_tool_calls()
-        if not last_tool_calls:
-            return None
-            
-        self.messages.append({
-            "role": "assistant",
-            "content": None,
-            "tool_calls": last_tool_calls
-        })
-        self.messages.append({
-            "role": "tool",
-            "content": tool_response,
-            "tool_call_id": last_tool_calls[0].id
-        })
+        # request() already stored the assistant message carrying the calls, its tool
+        # results must follow it directly. Calls set by hand get a message of their own.
+        if not _awaits_tool_results(self.messages):
+            self.messages.append({
+                "role": "assistant",
+                "content": None,
+                "tool_calls": tool_calls
+            })
+        # One tool response per call so every tool_call_id gets its answer
+        for tool_call, tool_response in zip(tool_calls, tool_responses):
+            self.messages.append({
+                "role": "tool",
+                "content": tool_response,
+                "tool_call_id": tool_call.id
+            })
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model=self.model,
                 messages=self.messages,
                 n=1,
@@ -0,0 +1,130 @@
+import json
+import time
+from typing import Optional, List, Dict, Any
+from .debug import debug_print, is_debug_enabled
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+DEFAULT_COMPLETION_WINDOW = "24h"
+DEFAULT_POLL_INTERVAL = 30  # Seconds between batch status checks
+
+# Batches in these states will not produce any more output
+_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+class BatchProcessor:
+    """Run chat completions through OpenAI's Batch API.
+
+    Batched requests are processed offline within the completion window, at a
+    lower cost and outside the per minute rate limits of regular requests.
+    """
+
+    def __init__(self, client: Any, model: str, completion_window: str = DEFAULT_COMPLETION_WINDOW):
+        """Initialize the processor
+
+        Args:
+            client: The OpenAI client
+            model: The model used for every request in a batch
+            completion_window: Time frame for the batch to be processed
+        """
+        self.client = client
+        self.model = model
+        self.completion_window = completion_window
+
+    def submit(
+        self,
+        conversations: List[List[Dict[str, Any]]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """Upload the requests and create a batch
+
+        Args:
+            conversations: The messages for each request, request i gets custom_id "request-i"
+            tools: Optional tool definitions sent with every request
+            temperature: Optional sampling temperature
+
+        Returns:
+            str: The batch id
+        """
+        lines = []
+        for i, messages in enumerate(conversations):
+            body = {"model": self.model, "messages": messages}
+            if tools:
+                body["tools"] = tools
+            if temperature is not None:
+                body["temperature"] = temperature
+            lines.append(json.dumps({
+                "custom_id": f"request-{i}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": body,
+            }))
+
+        # Uploaded from memory, the SDK accepts a (filename, content) tuple
+        input_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        if is_debug_enabled('agent'):
+            debug_print('agent', "Submitted batch %s with %d requests" % (batch.id, len(lines)))
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        """Get the current status of a batch (validating, in_progress, completed...)"""
+        return self.client.batches.retrieve(batch_id).status
+
+    def wait(self, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: Optional[float] = None) -> Any:
+        """Poll a batch until it stops processing
+
+        Args:
+            batch_id: The batch id
+            poll_interval: Seconds between status checks
+            timeout: Optional maximum number of seconds to wait
+
+        Returns:
+            The final batch object
+
+        Raises:
+            TimeoutError: If the batch is still processing after timeout seconds
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in _FINAL_STATES:
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch {batch_id} is still {batch.status}")
+            if is_debug_enabled('agent'):
+                debug_print('agent', "Batch %s is %s" % (batch_id, batch.status))
+            time.sleep(poll_interval)
+
+    def results(self, batch: Any) -> Dict[str, Optional[str]]:
+        """Download the output of a finished batch
+
+        Args:
+            batch: The batch object, as returned by wait
+
+        Returns:
+            dict: The response content for each custom_id, None for failed requests
+
+        Raises:
+            RuntimeError: If the batch produced no output
+        """
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} {batch.status} without output")
+
+        results = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line:
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                results[result["custom_id"]] = None
+                continue
+            results[result["custom_id"]] = response["body"]["choices"][0]["message"].get("content")
+        return results
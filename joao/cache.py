@@ -0,0 +1,90 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Union
+try:
+    import orjson  # Optional, several times faster at serializing long conversations
+except ImportError:
+    orjson = None
+
+DEFAULT_MAX_ENTRIES = 1024
+
+def _jsonable(obj: Any) -> Any:
+    """Serialize SDK objects kept in the history (e.g. ChatCompletionMessage)."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True)
+    return str(obj)
+
+class LLMCache:
+    """Exact match cache for deterministic (temperature 0) model responses.
+
+    Entries live in an in-memory LRU, or on disk when a directory is given
+    (requires the optional diskcache package).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Optional[str] = None):
+        """Initialize the cache
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            directory: Optional directory for a persistent diskcache backend
+        """
+        self.max_entries = max_entries
+        if directory:
+            try:
+                import diskcache
+            except ImportError:
+                raise ImportError("A disk cache requires diskcache: pip install diskcache")
+            self._store = diskcache.Cache(directory)
+        else:
+            self._store = OrderedDict()
+        # Agents share a cache across threads (e.g. request_batch). diskcache is
+        # thread safe, the in-memory LRU needs its lookups and evictions kept together.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Any], tools: Optional[Union[str, List[Dict]]], temperature: float) -> str:
+        """Build the cache key for a request
+
+        Args:
+            model: The model name
+            messages: The conversation sent to the model
+            tools: The tool definitions sent to the model, or a digest identifying them
+            temperature: The sampling temperature
+
+        Returns:
+            str: A sha256 hex digest identifying the request
+        """
+        request = {"model": model, "messages": messages, "tools": tools, "temperature": temperature}
+        if orjson is not None:
+            payload = orjson.dumps(request, default=_jsonable, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(request, sort_keys=True, default=_jsonable).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, None on a miss."""
+        if isinstance(self._store, OrderedDict):
+            with self._lock:
+                value = self._store.get(key)
+                if value is not None:
+                    self._store.move_to_end(key)  # Mark as recently used
+                return value
+        return self._store.get(key)
+
+    def set(self, key: str, value: str):
+        """Store a response, evicting the least recently used one when full."""
+        if isinstance(self._store, OrderedDict):
+            with self._lock:
+                self._store[key] = value
+                self._store.move_to_end(key)
+                if len(self._store) > self.max_entries:
+                    self._store.popitem(last=False)
+        else:
+            self._store[key] = value
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._store.clear()
@@ -1,6 +1,20 @@
 """Debug utilities for joao."""
 import os
-from typing import Optional
+from typing import FrozenSet, Optional
+
+_DEBUG_COMPONENTS: FrozenSet[str] = frozenset()
+_DEBUG_ANY = False
+
+def refresh_debug() -> None:
+    """Re-read the DEBUG environment variable.
+    
+    The enabled components are parsed once at import time; call this after
+    changing DEBUG at runtime (e.g. in tests).
+    """
+    global _DEBUG_COMPONENTS, _DEBUG_ANY
+    debug_env = os.getenv('DEBUG', '').lower()
+    _DEBUG_COMPONENTS = frozenset(c.strip() for c in debug_env.split(',') if c.strip())
+    _DEBUG_ANY = bool(_DEBUG_COMPONENTS)
 
 def is_debug_enabled(component: Optional[str] = None) -> bool:
     """Check if debug is enabled for a component.
@@ -11,12 +25,7 @@ def is_debug_enabled(component: Optional[str] = None) -> bool:
     Returns:
         bool: True if debug is enabled for the component or any component if component is None
     """
-    debug_env = os.getenv('DEBUG', '').lower()
-    if not debug_env:
-        return False
-        
-    components = [c.strip() for c in debug_env.split(',')]
-    return not component or component in components
+    return _DEBUG_ANY and (component is None or component in _DEBUG_COMPONENTS)
 
 def debug_print(component: str, *args, **kwargs):
     """Print debug message if debug is enabled for component.
@@ -28,3 +37,5 @@ def debug_print(component: str, *args, **kwargs):
     """
     if is_debug_enabled(component):
         print(f"[DEBUG {component.upper()}]", *args, **kwargs)
+
+refresh_debug()
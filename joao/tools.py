@@ -1,60 +1,263 @@
 import inspect
 from inspect import Parameter
 import json
+import hashlib
+import copy
 import asyncio
-from typing import Optional, List, Callable, Any, Dict, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Callable, Any, Dict, Tuple, Union, get_type_hints
 import os
+from weakref import WeakKeyDictionary
+try:
+    from orjson import loads as _loads  # Optional, several times faster on large arguments
+except ImportError:
+    from json import loads as _loads
 from .debug import debug_print, is_debug_enabled
 
-class ToolsHandler:
-    """Handler for synchronous tool calls."""
+# Tool schemas only depend on the callable, build them once per callable.
+# The cached dicts are shared, public methods hand out copies.
+_SCHEMA_CACHE: "WeakKeyDictionary[Callable, Tuple[Dict[str, Any], Dict[str, Any]]]" = WeakKeyDictionary()
+
+def _cache_get(cache: WeakKeyDictionary, callable: Callable) -> Any:
+    """Get a cached value, callables that can't be weakly referenced are never cached"""
+    try:
+        return cache.get(callable)
+    except TypeError:
+        return None
+
+def _cache_set(cache: WeakKeyDictionary, callable: Callable, value: Any) -> None:
+    """Cache a value for a callable if it can be weakly referenced"""
+    try:
+        cache[callable] = value
+    except TypeError:
+        pass
+
+MAX_TOOL_WORKERS = 32  # Upper bound on threads used to run one batch of sync tool calls
+
+_NONE_STR = str(None)  # What a tool call that produced nothing reports back
+
+_NO_TOOL = (None, None)  # _tools_by_name entry for unknown tool names
+
+_VARIADIC_KINDS = (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+
+# JSON schema types for annotations, anything else is described as a string
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+def _json_type(annotation: Any) -> str:
+    """Get the JSON schema type for a parameter annotation"""
+    try:
+        return _JSON_TYPES.get(annotation, "string")
+    except TypeError:  # Unhashable annotation
+        return "string"
+
+def _json_schema(annotation: Any) -> Dict[str, Any]:
+    """Get the JSON schema for a parameter annotation
+    
+    Arrays always describe their items (List[int] -> integer items, plain list -> strings),
+    OpenAI and Gemini reject array schemas without them.
+    """
+    origin = getattr(annotation, "__origin__", None)  # List[int] -> list, Dict[str, int] -> dict
+    json_type = _json_type(origin if origin is not None else annotation)
+    if json_type != "array":
+        return {"type": json_type}
+    args = getattr(annotation, "__args__", None)
+    item = args[0] if args and len(args) == 1 else str
+    return {"type": "array", "items": _json_schema(item)}
+
+def _build_schema(callable: Callable, always_required: bool) -> Dict[str, Any]:
+    """Get the OpenAI function schema for a callable, building it on first use
+    
+    Args:
+        callable: The function to get the schema for
+        always_required: If False, "required" is left out when no parameter is required
+        
+    Returns:
+        dict: The shared, cached schema
+    """
+    variants = _cache_get(_SCHEMA_CACHE, callable)
+    if variants is None:
+        schema = _inspect_schema(callable)
+        function = schema["function"]
+        if function["parameters"]["required"]:
+            variants = (schema, schema)
+        else:
+            parameters = {"type": "object", "properties": function["parameters"]["properties"]}
+            variants = ({**schema, "function": {**function, "parameters": parameters}}, schema)
+        # Dumping every schema is noisy and costs a serialization pass, so it has its own flag
+        if is_debug_enabled('tools.schema'):
+            debug_print('tools.schema', "Created tool definition for %s:" % callable.__name__)
+            debug_print('tools.schema', json.dumps(schema, indent=2))
+        _cache_set(_SCHEMA_CACHE, callable, variants)
+    return variants[always_required]
+
+def _inspect_schema(callable: Callable) -> Dict[str, Any]:
+    """Build the OpenAI function schema for a callable from its signature and docstring"""
+    # Get function signature, decorators (functools.wraps, pydantic...) often set it already.
+    # Only for plain functions, a bound method passes the lookup on to its function,
+    # whose signature still has self.
+    sig = getattr(callable, "__signature__", None) if inspect.isfunction(callable) else None
+    if not isinstance(sig, inspect.Signature):
+        sig = inspect.signature(callable)
+    
+    # Postponed annotations (from __future__ import annotations) are strings, resolve them
+    hints = {}
+    if any(isinstance(param.annotation, str) for param in sig.parameters.values()):
+        try:
+            hints = get_type_hints(callable)
+        except Exception:
+            pass  # Unresolvable names, those parameters stay strings
+    
+    # Create parameters schema
+    properties = {}
+    required = []
+    
+    for name, param in sig.parameters.items():
+        if param.kind in _VARIADIC_KINDS:
+            continue  # Skip *args and **kwargs
+            
+        # Add parameter to required list if it has no default value
+        if param.default is Parameter.empty:
+            required.append(name)
+            
+        properties[name] = _json_schema(hints.get(name, param.annotation))
+        
+    # Create the complete tool schema
+    return {
+        "type": "function",
+        "function": {
+            "name": callable.__name__,
+            "description": callable.__doc__ or "",
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required
+            }
+        }
+    }
 
-    def __init__(self):
+class _BaseToolsHandler:
+    """Tool bookkeeping shared by the sync and async handlers."""
+
+    def __init__(self, dedupe_calls: bool = False):
+        """Initialize the handler
+        
+        Args:
+            dedupe_calls: If True, identical tool calls (same tool and arguments) within
+                one batch run once and share the response. Only safe for tools without
+                side effects, so it is off by default.
+        """
+        self.dedupe_calls = dedupe_calls
         self.tools = None
         self.tool_calls = []
         self._last_tool_calls = []
-
-    def debug_print(self, *args, **kwargs):
-        """Print debug information if debug is enabled for tools component"""
-        debug_print('tools', *args, **kwargs)
+        self._tools_key = ()  # Ids of the tools the cached data below was built for
+        self._tools_definitions = []
+        self._tools_digest = None  # Hash of _tools_definitions, built on first use
+        self._tools_by_name = {}  # name -> (tool, whether it is a coroutine function)
+        self._parsed_args = {}  # id(tool_call) -> (tool_call, parsed arguments)
+
+    def debug_print(self, msg: str, *args):
+        """Print debug information if debug is enabled for tools component
+        
+        The message is only %-formatted with args when it is actually printed.
+        """
+        if is_debug_enabled('tools'):
+            debug_print('tools', msg % args if args else msg)
 
     def set_tools(self, tools: Optional[List[Callable]]) -> None:
         """Set the available tools for the handler"""
         self.tools = tools
+        # Requests usually pass the same tools every time, keep what was built for them.
+        # _tools_by_name holds references to the tools, so their ids can't be reused.
+        tools_key = tuple(id(tool) for tool in tools) if tools else ()
+        if tools_key == self._tools_key:
+            return
+        self._tools_key = tools_key
+        # Build the definitions here, so requests don't inspect signatures
+        self._tools_definitions = [_build_schema(tool, always_required=False) for tool in tools] if tools else []
+        self._tools_digest = None
+        # Whether a tool is async never changes, check it once here instead of on every call
+        self._tools_by_name = {tool.__name__: (tool, asyncio.iscoroutinefunction(tool)) for tool in (tools or [])}
         if is_debug_enabled('tools'):
             self.debug_print("Available tools:")
             if tools:
                 for tool in tools:
-                    self.debug_print(f"- {tool.__name__}: {tool.__doc__}")
+                    self.debug_print("- %s: %s", tool.__name__, tool.__doc__)
             else:
                 self.debug_print("No tools available")
 
+    def fork(self) -> "_BaseToolsHandler":
+        """Get a handler sharing this one's tools and built definitions, without pending calls"""
+        handler = copy.copy(self)
+        handler.tool_calls = []
+        handler._last_tool_calls = []
+        handler._parsed_args = {}
+        return handler
+
     def clear_tool_calls(self) -> None:
         """Clear all pending tool calls"""
         if is_debug_enabled('tools'):
             self.debug_print("Clearing tool calls")
         self.tool_calls = []
+        self._parsed_args = {}
 
     def set_tool_calls(self, tool_calls: Optional[List[Any]]) -> None:
         """Set the pending tool calls"""
         self._last_tool_calls = self.tool_calls
         self.tool_calls = tool_calls or []
+        self._parsed_args = {}
         if is_debug_enabled('tools'):
-            self.debug_print(f"Set {len(self.tool_calls)} new tool calls")
+            self.debug_print("Set %d new tool calls", len(self.tool_calls))
             for call in self.tool_calls:
-                self.debug_print(f"- Tool call: {call.function.name} with args: {call.function.arguments}")
+                self.debug_print("- Tool call: %s with args: %s", call.function.name, call.function.arguments)
 
     def has_pending_calls(self) -> bool:
         """Check if there are any pending tool calls"""
         has_calls = bool(self.tool_calls)
         if is_debug_enabled('tools'):
-            self.debug_print(f"Has pending calls: {has_calls}")
+            self.debug_print("Has pending calls: %s", has_calls)
         return has_calls
 
+    def _parse_arguments(self, tool_call: Any) -> Dict[str, Any]:
+        """Parse the JSON arguments of a tool call, once per pending tool call"""
+        # The entry keeps a reference to the call, so its id can't be reused while cached
+        entry = self._parsed_args.get(id(tool_call))
+        if entry is None:
+            entry = self._parsed_args[id(tool_call)] = (tool_call, _loads(tool_call.function.arguments))
+        return entry[1]
+
+    def _unique_calls(self, tool_calls: List[Any]) -> Tuple[List[Any], Dict[Any, Any]]:
+        """Group the tool calls that run only once
+        
+        With dedupe_calls, calls asking for the same tool with the same arguments are
+        grouped (models sometimes repeat a call within a turn), otherwise every call runs.
+        
+        Returns:
+            tuple: The key of every call, and the call to run for each key
+        """
+        if not self.dedupe_calls:
+            return list(range(len(tool_calls))), dict(enumerate(tool_calls))
+        keys = [(tool_call.function.name, tool_call.function.arguments) for tool_call in tool_calls]
+        unique = {}
+        for key, tool_call in zip(keys, tool_calls):
+            unique.setdefault(key, tool_call)
+        return keys, unique
+
+    def get_tool(self, name: str) -> Optional[Callable]:
+        """Get an available tool by name"""
+        return self._tools_by_name.get(name, _NO_TOOL)[0]
+
     def get_last_tool_calls(self) -> List[Any]:
         """Get the tool calls from the last request"""
         if is_debug_enabled('tools'):
-            self.debug_print(f"Getting last {len(self._last_tool_calls)} tool calls")
+            self.debug_print("Getting last %d tool calls", len(self._last_tool_calls))
         return self._last_tool_calls
 
     def create_tool_def(self, callable: Callable) -> Dict[str, Any]:
@@ -66,62 +269,52 @@ class ToolsHandler:
             callable: The function or method to create a tool definition for
             
         Returns:
-            dict: A tool definition containing name, description, and parameters schema
+            dict: A tool definition containing name, description, and parameters schema,
+                a copy the caller is free to modify
         """
-        # Get function signature
-        sig = inspect.signature(callable)
-        
-        # Create parameters schema
-        properties = {}
-        required = []
-        
-        for name, param in sig.parameters.items():
-            param_def = {"type": "string"}  # Default to string type
-            
-            # Handle different parameter kinds
-            if param.kind == Parameter.VAR_POSITIONAL:
-                continue  # Skip *args
-            if param.kind == Parameter.VAR_KEYWORD:
-                continue  # Skip **kwargs
-                
-            # Add parameter to required list if it has no default value
-            if param.default == Parameter.empty:
-                required.append(name)
-                
-            properties[name] = param_def
-            
-        # Create the complete tool definition
-        tool_def = {
-            "type": "function",
-            "function": {
-                "name": callable.__name__,
-                "description": callable.__doc__ or "",
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                }
-            }
-        }
-        
-        if required:
-            tool_def["function"]["parameters"]["required"] = required
-            
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Created tool definition for {callable.__name__}:")
-            self.debug_print(json.dumps(tool_def, indent=2))
-            
-        return tool_def
+        return copy.deepcopy(_build_schema(callable, always_required=False))
 
     def get_tools_definitions(self) -> List[Dict[str, Any]]:
-        """Get the tool definitions for all available tools"""
-        if not self.tools:
-            if is_debug_enabled('tools'):
-                self.debug_print("No tools available")
-            return []
-        defs = [self.create_tool_def(tool) for tool in self.tools]
+        """Get the tool definitions for all available tools
+        
+        The list is built by set_tools and shared, callers must not modify it.
+        """
         if is_debug_enabled('tools'):
-            self.debug_print(f"Generated {len(defs)} tool definitions")
-        return defs
+            self.debug_print("Returning %d tool definitions", len(self._tools_definitions))
+        return self._tools_definitions
+
+    def get_tools_digest(self) -> str:
+        """Get a sha256 hex digest of the tool definitions
+        
+        The definitions are serialized once per set of tools, so callers that need
+        to identify them on every request (e.g. cache keys) don't serialize them again.
+        """
+        if self._tools_digest is None:
+            payload = json.dumps(self._tools_definitions, sort_keys=True).encode("utf-8")
+            self._tools_digest = hashlib.sha256(payload).hexdigest()
+        return self._tools_digest
+
+    def get_pending_calls(self) -> List[Any]:
+        """Get the list of pending tool calls"""
+        return self.tool_calls
+
+    def clear_pending_calls(self) -> None:
+        """Clear the list of pending tool calls"""
+        self.clear_tool_calls()
+
+class ToolsHandler(_BaseToolsHandler):
+    """Handler for synchronous tool calls."""
+
+    def __init__(self, dedupe_calls: bool = False, concurrent_calls: bool = True):
+        """Initialize the handler
+        
+        Args:
+            dedupe_calls: If True, identical tool calls within one batch run once
+            concurrent_calls: If True, a batch of tool calls runs on worker threads.
+                Disable it for tools that are not thread safe (e.g. a sqlite3 connection).
+        """
+        super().__init__(dedupe_calls)
+        self.concurrent_calls = concurrent_calls
 
     def get_tool_schemas(self) -> Optional[List[Dict]]:
         """Get the OpenAI function schemas for all available tools
@@ -147,45 +340,9 @@ class ToolsHandler:
             tool: The tool function to get schema for
             
         Returns:
-            Dict: OpenAI function schema
+            Dict: OpenAI function schema, a copy the caller is free to modify
         """
-        # Get function signature
-        sig = inspect.signature(tool)
-        
-        # Create parameters schema
-        properties = {}
-        required = []
-        
-        for name, param in sig.parameters.items():
-            param_def = {"type": "string"}  # Default to string type
-            
-            # Handle different parameter kinds
-            if param.kind == Parameter.VAR_POSITIONAL:
-                continue  # Skip *args
-            if param.kind == Parameter.VAR_KEYWORD:
-                continue  # Skip **kwargs
-                
-            # Add parameter to required list if it has no default value
-            if param.default == Parameter.empty:
-                required.append(name)
-                
-            properties[name] = param_def
-            
-        # Create the complete tool schema
-        tool_schema = {
-            "type": "function",
-            "function": {
-                "name": tool.__name__,
-                "description": tool.__doc__ or "",
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                    "required": required
-                }
-            }
-        }
-        
-        return tool_schema
+        return copy.deepcopy(_build_schema(tool, always_required=True))
 
     def execute_tool_call(self, tool_call: Any) -> str:
         """Execute a single tool call
@@ -196,33 +353,36 @@ class ToolsHandler:
         Returns:
             str: The tool response
         """
+        dbg = is_debug_enabled('tools')
         if not self.tools:
-            if is_debug_enabled('tools'):
+            if dbg:
                 self.debug_print("No tools available")
             return None
             
         tool_name = tool_call.function.name
-        tool_args = json.loads(tool_call.function.arguments)
+        tool_args = self._parse_arguments(tool_call)
         
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Executing tool: {tool_name}")
-            self.debug_print(f"Arguments: {tool_args}")
+        if dbg:
+            self.debug_print("Executing tool: %s", tool_name)
+            self.debug_print("Arguments: %s", tool_args)
             
-        tool = next((t for t in self.tools if t.__name__ == tool_name), None)
+        tool, is_async = self._tools_by_name.get(tool_name, _NO_TOOL)
         if not tool:
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Tool not found: {tool_name}")
-            return str(None)
+            if dbg:
+                self.debug_print("Tool not found: %s", tool_name)
+            return _NONE_STR
+        if is_async:
+            raise TypeError("Cannot execute async tool in sync handler")
             
         try:
             response = tool(**tool_args)
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Tool response: {response}")
-            return str(response) if response is not None else str(None)
+            if dbg:
+                self.debug_print("Tool response: %s", response)
+            return str(response) if response is not None else _NONE_STR
         except Exception as e:
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Error executing tool: {e}")
-            return str(None)
+            if dbg:
+                self.debug_print("Error executing tool: %s", e)
+            return _NONE_STR
 
     def execute_tool_calls(self) -> Optional[str]:
         """Execute all pending tool calls
@@ -235,21 +395,37 @@ class ToolsHandler:
                 self.debug_print("No pending tool calls to execute")
             return None
 
-        results = []
-        for tool_call in self.tool_calls:
-            response = self.execute_tool_call(tool_call)
-            if response is not None:
-                results.append(response)
-
-        return "\n".join(results)
-
-    def get_pending_calls(self) -> List[Any]:
-        """Get the list of pending tool calls"""
-        return self.tool_calls
-
-    def clear_pending_calls(self) -> None:
-        """Clear the list of pending tool calls"""
+        responses = self.run_tool_calls(self.tool_calls)
         self.clear_tool_calls()
+        if len(responses) == 1:
+            return responses[0]  # The usual case, nothing to join
+        return "\n".join(response for response in responses if response is not None)
+
+    def run_tool_calls(self, tool_calls: List[Any]) -> List[Optional[str]]:
+        """Execute tool calls, concurrently when there is more than one and concurrent_calls is set
+        
+        Args:
+            tool_calls: The tool calls to execute
+            
+        Returns:
+            List[Optional[str]]: The tool responses, in the same order as the calls
+        """
+        # Check every call before running any, so a bad batch has no side effects
+        for tool_call in tool_calls:
+            if self._tools_by_name.get(tool_call.function.name, _NO_TOOL)[1] is True:
+                raise TypeError("Cannot execute async tool in sync handler")
+
+        if len(tool_calls) == 1:
+            return [self.execute_tool_call(tool_calls[0])]
+
+        keys, unique = self._unique_calls(tool_calls)
+        if self.concurrent_calls:
+            # Tools are usually I/O bound, so threads overlap their waits
+            with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(unique))) as executor:
+                responses = dict(zip(unique, executor.map(self.execute_tool_call, unique.values())))
+        else:
+            responses = {key: self.execute_tool_call(tool_call) for key, tool_call in unique.items()}
+        return [responses[key] for key in keys]
 
     def _call_tool(self, tool_call: Any) -> Any:
         """
@@ -262,140 +438,36 @@ class ToolsHandler:
             return None
             
         tool_name = tool_call.function.name
-        tool = next((t for t in self.tools if t.__name__ == tool_name), None)
+        tool, is_async = self._tools_by_name.get(tool_name, _NO_TOOL)
         
         if not tool:
             return None
             
-        if asyncio.iscoroutinefunction(tool):
+        if is_async:
             raise TypeError("Cannot execute async tool in sync handler")
             
         try:
-            args = json.loads(tool_call.function.arguments)
+            args = self._parse_arguments(tool_call)
             if is_debug_enabled('tools'):
-                self.debug_print(f"Calling tool {tool_name} with args: {args}")
+                self.debug_print("Calling tool %s with args: %s", tool_name, args)
             return tool(**args)
         except Exception as e:
             if is_debug_enabled('tools'):
-                self.debug_print(f"Error executing {tool_name}: {str(e)}")
+                self.debug_print("Error executing %s: %s", tool_name, e)
             return f"Error executing {tool_name}: {str(e)}"
 
-class AsyncToolsHandler:
+class AsyncToolsHandler(_BaseToolsHandler):
     """Handler for asynchronous tool calls."""
 
-    def __init__(self):
-        self.tools = None
-        self.tool_calls = []
-        self._last_tool_calls = []
-
-    def debug_print(self, *args, **kwargs):
-        """Print debug information if debug is enabled for tools component"""
-        debug_print('tools', *args, **kwargs)
-
-    def set_tools(self, tools: Optional[List[Callable]]) -> None:
-        """Set the available tools for the handler"""
-        self.tools = tools
-        if is_debug_enabled('tools'):
-            self.debug_print("Available tools:")
-            if tools:
-                for tool in tools:
-                    self.debug_print(f"- {tool.__name__}: {tool.__doc__}")
-            else:
-                self.debug_print("No tools available")
-
-    def clear_tool_calls(self) -> None:
-        """Clear all pending tool calls"""
-        if is_debug_enabled('tools'):
-            self.debug_print("Clearing tool calls")
-        self.tool_calls = []
-
-    def set_tool_calls(self, tool_calls: Optional[List[Any]]) -> None:
-        """Set the pending tool calls"""
-        self._last_tool_calls = self.tool_calls
-        self.tool_calls = tool_calls or []
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Set {len(self.tool_calls)} new tool calls")
-            for call in self.tool_calls:
-                self.debug_print(f"- Tool call: {call.function.name} with args: {call.function.arguments}")
-
-    def has_pending_calls(self) -> bool:
-        """Check if there are any pending tool calls"""
-        has_calls = bool(self.tool_calls)
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Has pending calls: {has_calls}")
-        return has_calls
-
-    def get_last_tool_calls(self) -> List[Any]:
-        """Get the tool calls from the last request"""
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Getting last {len(self._last_tool_calls)} tool calls")
-        return self._last_tool_calls
-
-    def create_tool_def(self, callable: Callable) -> Dict[str, Any]:
-        """
-        Create a tool definition based on a function's signature and docstring.
-        The definition follows the JSONSchema format used for tool descriptions.
+    def __init__(self, max_concurrency: int = 8, dedupe_calls: bool = False):
+        """Initialize the handler
         
         Args:
-            callable: The function or method to create a tool definition for
-            
-        Returns:
-            dict: A tool definition containing name, description, and parameters schema
+            max_concurrency: Maximum number of tool calls awaited at the same time
+            dedupe_calls: If True, identical tool calls within one batch run once
         """
-        # Get function signature
-        sig = inspect.signature(callable)
-        
-        # Create parameters schema
-        properties = {}
-        required = []
-        
-        for name, param in sig.parameters.items():
-            param_def = {"type": "string"}  # Default to string type
-            
-            # Handle different parameter kinds
-            if param.kind == Parameter.VAR_POSITIONAL:
-                continue  # Skip *args
-            if param.kind == Parameter.VAR_KEYWORD:
-                continue  # Skip **kwargs
-                
-            # Add parameter to required list if it has no default value
-            if param.default == Parameter.empty:
-                required.append(name)
-                
-            properties[name] = param_def
-            
-        # Create the complete tool definition
-        tool_def = {
-            "type": "function",
-            "function": {
-                "name": callable.__name__,
-                "description": callable.__doc__ or "",
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                }
-            }
-        }
-        
-        if required:
-            tool_def["function"]["parameters"]["required"] = required
-            
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Created tool definition for {callable.__name__}:")
-            self.debug_print(json.dumps(tool_def, indent=2))
-            
-        return tool_def
-
-    def get_tools_definitions(self) -> List[Dict[str, Any]]:
-        """Get the tool definitions for all available tools"""
-        if not self.tools:
-            if is_debug_enabled('tools'):
-                self.debug_print("No tools available")
-            return []
-        defs = [self.create_tool_def(tool) for tool in self.tools]
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Generated {len(defs)} tool definitions")
-        return defs
+        super().__init__(dedupe_calls)
+        self.max_concurrency = max_concurrency
 
     async def execute_tool_call(self, tool_call: Any) -> str:
         """Execute a single tool call
@@ -406,33 +478,36 @@ class AsyncToolsHandler:
         Returns:
             str: The tool response
         """
+        dbg = is_debug_enabled('tools')
         if not self.tools:
-            if is_debug_enabled('tools'):
+            if dbg:
                 self.debug_print("No tools available")
             return None
             
         tool_name = tool_call.function.name
-        tool_args = json.loads(tool_call.function.arguments)
+        tool_args = self._parse_arguments(tool_call)
         
-        if is_debug_enabled('tools'):
-            self.debug_print(f"Executing tool: {tool_name}")
-            self.debug_print(f"Arguments: {tool_args}")
+        if dbg:
+            self.debug_print("Executing tool: %s", tool_name)
+            self.debug_print("Arguments: %s", tool_args)
             
-        tool = next((t for t in self.tools if t.__name__ == tool_name), None)
+        tool, is_async = self._tools_by_name.get(tool_name, _NO_TOOL)
         if not tool:
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Tool not found: {tool_name}")
-            return str(None)
+            if dbg:
+                self.debug_print("Tool not found: %s", tool_name)
+            return _NONE_STR
+        if not is_async:
+            raise TypeError("Cannot execute sync tool in async handler")
             
         try:
             response = await tool(**tool_args)
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Tool response: {response}")
-            return str(response) if response is not None else str(None)
+            if dbg:
+                self.debug_print("Tool response: %s", response)
+            return str(response) if response is not None else _NONE_STR
         except Exception as e:
-            if is_debug_enabled('tools'):
-                self.debug_print(f"Error executing tool: {e}")
-            return str(None)
+            if dbg:
+                self.debug_print("Error executing tool: %s", e)
+            return _NONE_STR
 
     async def execute_tool_calls(self) -> Optional[str]:
         """Execute all pending tool calls
@@ -445,21 +520,50 @@ class AsyncToolsHandler:
                 self.debug_print("No pending tool calls to execute")
             return None
 
-        results = []
-        for tool_call in self.tool_calls:
-            response = await self.execute_tool_call(tool_call)
-            if response is not None:
-                results.append(response)
-
-        return "\n".join(results)
-
-    def get_pending_calls(self) -> List[Any]:
-        """Get the list of pending tool calls"""
-        return self.tool_calls
-
-    def clear_pending_calls(self) -> None:
-        """Clear the list of pending tool calls"""
+        responses = await self.run_tool_calls(self.tool_calls)
         self.clear_tool_calls()
+        if len(responses) == 1:
+            return responses[0]  # The usual case, nothing to join
+        return "\n".join(response for response in responses if response is not None)
+
+    async def run_tool_calls(self, tool_calls: List[Any]) -> List[Optional[str]]:
+        """Execute tool calls concurrently, at most max_concurrency at a time
+        
+        Args:
+            tool_calls: The tool calls to execute
+            
+        Returns:
+            List[Optional[str]]: The tool responses, in the same order as the calls
+        """
+        # Check every call before awaiting any, so a bad batch has no side effects
+        for tool_call in tool_calls:
+            if self._tools_by_name.get(tool_call.function.name, _NO_TOOL)[1] is False:
+                raise TypeError("Cannot execute sync tool in async handler")
+
+        if len(tool_calls) == 1:
+            try:
+                return [await self.execute_tool_call(tool_calls[0])]
+            except Exception as e:
+                return [f"Error: {e}"]
+
+        keys, unique = self._unique_calls(tool_calls)
+        # Created per batch so it always belongs to the running event loop
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(tool_call):
+            async with semaphore:
+                return await self.execute_tool_call(tool_call)
+
+        # gather keeps the responses in the order of the unique calls
+        responses = await asyncio.gather(
+            *(bounded(tool_call) for tool_call in unique.values()),
+            return_exceptions=True
+        )
+        responses = {
+            key: f"Error: {response}" if isinstance(response, Exception) else response
+            for key, response in zip(unique, responses)
+        }
+        return [responses[key] for key in keys]
 
     async def _call_tool(self, tool_call: Any) -> Any:
         """
@@ -472,20 +576,20 @@ class AsyncToolsHandler:
             return None
             
         tool_name = tool_call.function.name
-        tool = next((t for t in self.tools if t.__name__ == tool_name), None)
+        tool, is_async = self._tools_by_name.get(tool_name, _NO_TOOL)
         
         if not tool:
             return None
             
-        if not asyncio.iscoroutinefunction(tool):
+        if not is_async:
             raise TypeError("Cannot execute sync tool in async handler")
             
         try:
-            args = json.loads(tool_call.function.arguments)
+            args = self._parse_arguments(tool_call)
             if is_debug_enabled('tools'):
-                self.debug_print(f"Calling tool {tool_name} with args: {args}")
+                self.debug_print("Calling tool %s with args: %s", tool_name, args)
             return await tool(**args)
         except Exception as e:
             if is_debug_enabled('tools'):
-                self.debug_print(f"Error executing {tool_name}: {str(e)}")
+                self.debug_print("Error executing %s: %s", tool_name, e)
             return f"Error executing {tool_name}: {str(e)}"
\ No newline at end of file
@@ -12,7 +12,7 @@ def search_for(person: str) -> str:
         return "Near the barbecue"
     return "I am unable to see it"
 
-
-agent =  Agent("You are Asterix")
-response = agent.request("Where is the IdeaFix and Obelix?", tools=[search_for], use_tools=True)
-print(response)
+if __name__ == "__main__":
+    agent =  Agent("You are Asterix")
+    response = agent.request("Where is the IdeaFix and Obelix?", tools=[search_for], auto_use_tools=True)
+    print(response)
@@ -7,6 +7,7 @@ def batmobile(location: str):
     """ Can be used to drive to some location """
     print(f"Driving you to {location}!")
 
-agent =  Agent("You are Batman")
-agent.request("Hello, can you drive me to Gotham City?", tools=[batmobile])
-answer = agent.use_tools()
+if __name__ == "__main__":
+    agent =  Agent("You are Batman")
+    agent.request("Hello, can you drive me to Gotham City?", tools=[batmobile])
+    answer = agent.use_tools()
@@ -7,6 +7,7 @@ def batmobile(location: str):
     """ Can be used to drive to some location """
     print(f"Driving you to {location}!")
 
-snooy =  Agent("You are snoopy")
-response = snooy.request("Who are your friends?")
-print(response)
\ No newline at end of file
+if __name__ == "__main__":
+    snooy =  Agent("You are snoopy")
+    response = snooy.request("Who are your friends?")
+    print(response)
@@ -1,4 +1,3 @@
-from joao import Agent
 from typing import List, Dict, Any
 import os
 
@@ -18,6 +17,8 @@ def search_web(query: str) -> List[Dict[str, Any]]:
     ]
 
 def main():
+    from joao import Agent  # Only needed when run, importing this module stays cheap
+    
     # Define supported tools
     supported_tools = [search_web]
     
@@ -0,0 +1,27 @@
+import json
+from openai import RateLimitError
+from typing import Optional, List
+from ._stubs import FunctionStub, ToolCallStub, MessageStub, ChoiceStub, ResponseStub, HTTPResponseStub
+
+def make_response(content: Optional[str], tool_calls: Optional[List[ToolCallStub]] = None) -> ResponseStub:
+    """Build a chat completion response with a single choice"""
+    return ResponseStub([ChoiceStub(MessageStub(content, tool_calls))])
+
+def make_tool_call(name: str, arguments: str, id: str = "call_1") -> ToolCallStub:
+    """Build a tool call requested by the model"""
+    return ToolCallStub(id, FunctionStub(name, arguments))
+
+def make_sse_lines(*events: str) -> List[str]:
+    """Build the lines of a chat completion stream, events are JSON payloads or [DONE]"""
+    lines = []
+    for event in events:
+        lines.extend((f"data: {event}", ""))
+    return lines
+
+def delta_event(content: str) -> str:
+    """Build a stream chunk carrying some content"""
+    return json.dumps({"choices": [{"index": 0, "delta": {"content": content}}]})
+
+def make_rate_limit_error() -> RateLimitError:
+    """Build the error raised when the provider answers 429 Too Many Requests"""
+    return RateLimitError("Rate limit reached", response=HTTPResponseStub(429), body=None)
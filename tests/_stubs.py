@@ -0,0 +1,52 @@
+"""Plain stand-ins for the OpenAI response objects used in the tests.
+
+Unlike Mock, attribute access on these is a normal lookup, and a typo fails
+loudly instead of silently returning a child Mock.
+"""
+from dataclasses import dataclass, field
+from typing import Optional, List, Any
+
+@dataclass
+class FunctionStub:
+    name: str
+    arguments: str
+
+@dataclass
+class ToolCallStub:
+    id: str
+    function: FunctionStub
+    type: str = "function"
+
+@dataclass
+class MessageStub:
+    content: Optional[str]
+    tool_calls: Optional[List[ToolCallStub]] = None
+    role: str = "assistant"
+
+@dataclass
+class ChoiceStub:
+    message: MessageStub
+
+@dataclass
+class ResponseStub:
+    choices: List[ChoiceStub] = field(default_factory=list)
+
+@dataclass
+class StreamResponseStub:
+    """An open streaming HTTP response, as returned when entering with_streaming_response"""
+    lines: List[str]
+    http_request: Any = None
+    closed: bool = False
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+@dataclass
+class HTTPResponseStub:
+    """The parts of an HTTP response read when building an API status error"""
+    status_code: int
+    headers: dict = field(default_factory=dict)
+    request: Any = None
@@ -1,9 +1,11 @@
-import os
 import pytest
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope="session")
 def mock_env_vars():
-    """Set up mock environment variables for testing"""
-    os.environ["OPENAI_API_KEY"] = "test_key"
-    os.environ["OPENAI_BASE_URL"] = "https://test.api/v1"
-    os.environ["OPENAI_MODEL"] = "test-model"
+    """Set up mock environment variables once for the whole test session"""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+    monkeypatch.setenv("OPENAI_BASE_URL", "https://test.api/v1")
+    monkeypatch.setenv("OPENAI_MODEL", "test-model")
+    yield
+    monkeypatch.undo()
@@ -1,7 +1,19 @@
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
+from openai import APIError, RateLimitError
 from joao import Agent
 from joao import AsyncAgent
+from joao import LLMCache
+from joao import configure_concurrency
+from joao.agent import _iter_sse_content
+from joao._chunks import batch_chunks, abatch_chunks
+from joao.async_agent import DEFAULT_MAX_CONCURRENT_REQUESTS, MAX_RATE_LIMIT_RETRIES, _request_semaphore
+from ._helpers import make_response, make_tool_call, make_sse_lines, delta_event, make_rate_limit_error
+from ._stubs import StreamResponseStub
 
 @pytest.fixture
 def mock_openai():
@@ -11,15 +23,7 @@ def mock_openai():
         mock.return_value = mock_client
         
         # Create mock response
-        mock_message = Mock()
-        mock_message.content = "Hello, I'm a mock response"
-        mock_message.tool_calls = None
-        
-        mock_choice = Mock()
-        mock_choice.message = mock_message
-        
-        mock_response = Mock()
-        mock_response.choices = [mock_choice]
+        mock_response = make_response("Hello, I'm a mock response")
         
         # Set up the mock chat completions
         mock_client.chat.completions.create.return_value = mock_response
@@ -33,15 +37,7 @@ def mock_async_openai():
         mock.return_value = mock_client
         
         # Create mock response
-        mock_message = Mock()
-        mock_message.content = "Hello, I'm a mock response"
-        mock_message.tool_calls = None
-        
-        mock_choice = Mock()
-        mock_choice.message = mock_message
-        
-        mock_response = Mock()
-        mock_response.choices = [mock_choice]
+        mock_response = make_response("Hello, I'm a mock response")
         
         # Set up the mock chat completions to return an awaitable
         async def async_create(**kwargs):
@@ -57,6 +53,23 @@ def test_agent_initialization():
     assert agent.messages[0]["role"] == "system"
     assert agent.messages[0]["content"] == "test prompt"
 
+def test_agent_reset(mock_openai):
+    agent = Agent("test prompt")
+    messages = agent.messages
+    agent.request("test message")
+
+    agent.reset()
+    assert agent.messages is messages
+    assert agent.messages == [{"role": "system", "content": "test prompt"}]
+
+    agent.reset("new prompt")
+    assert agent.system_prompt == "new prompt"
+    assert agent.messages == [{"role": "system", "content": "new prompt"}]
+
+def test_agents_share_client():
+    assert Agent("test prompt").client is Agent("other prompt").client
+    assert Agent("test prompt").client is not Agent("test prompt", api_key="other_key").client
+
 def test_agent_request_without_tools(mock_openai):
     agent = Agent("test prompt")
     response = agent.request("test message")
@@ -66,6 +79,298 @@ def test_agent_request_without_tools(mock_openai):
     assert agent.messages[1]["role"] == "user"
     assert agent.messages[1]["content"] == "test message"
 
+def test_agent_request_with_cache(mock_openai):
+    cache = LLMCache()
+    first = Agent("test prompt", cache=cache)
+    second = Agent("test prompt", cache=cache)
+
+    assert first.request("test message") == "Hello, I'm a mock response"
+    assert second.request("test message") == "Hello, I'm a mock response"
+    # The second agent sends the same conversation and is served from the cache
+    assert mock_openai.chat.completions.create.call_count == 1
+    assert second.messages[-1] == {"role": "assistant", "content": "Hello, I'm a mock response"}
+
+def test_cache_shared_between_threads():
+    cache = LLMCache(max_entries=4)
+
+    def worker(offset):
+        for i in range(2000):
+            cache.set(str((offset + i) % 9), "response")
+            cache.get(str(i % 9))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # Concurrent lookups and evictions must not raise (e.g. KeyError in move_to_end)
+        list(executor.map(worker, range(8)))
+    assert len(cache._store) == 4
+
+def _conversation(turns):
+    """User and assistant message pairs"""
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+    return messages
+
+def test_trim_history_keeps_system_prompt():
+    agent = Agent("test prompt", max_history_messages=5)
+    agent.messages.extend(_conversation(4))
+
+    agent._trim_history()
+    # Room is left for the next user message
+    assert agent.messages == [{"role": "system", "content": "test prompt"}] + _conversation(4)[-4:]
+
+def test_trim_history_without_system_prompt():
+    agent = Agent(max_history_messages=5)
+    agent.messages.extend(_conversation(4))
+
+    agent._trim_history()
+    assert agent.messages == _conversation(4)[-4:]
+
+def test_trim_history_keeps_tool_results_with_their_call():
+    tool_call = {"id": "call_1", "type": "function", "function": {"name": "test_tool", "arguments": "{}"}}
+    tool_turn = [
+        {"role": "user", "content": "use the tool"},
+        {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+        {"role": "tool", "content": "result", "tool_call_id": "call_1"},
+        {"role": "assistant", "content": "done"},
+    ]
+    agent = Agent("test prompt", max_history_messages=5)
+    agent.messages.extend(tool_turn + _conversation(1))
+
+    agent._trim_history()
+    # The window starts on the tool result, the whole tool turn is dropped instead
+    assert agent.messages == [{"role": "system", "content": "test prompt"}] + _conversation(1)
+
+def test_agent_request_batch(mock_openai):
+    agent = Agent("test prompt")
+    responses = agent.request_batch(["first message", "second message"])
+
+    assert responses == ["Hello, I'm a mock response"] * 2
+    assert mock_openai.chat.completions.create.call_count == 2
+    # Each prompt gets its own conversation, the agent history is untouched
+    for call in mock_openai.chat.completions.create.call_args_list:
+        assert len(call[1]["messages"]) == 3  # system + user + assistant
+    assert len(agent.messages) == 1
+
+def test_agent_submit_and_fetch_batch(mock_openai):
+    mock_openai.files.create.return_value = Mock(id="file_1")
+    mock_openai.batches.create.return_value = Mock(id="batch_1")
+
+    agent = Agent("test prompt")
+    assert agent.submit_batch(["first message", "second message"]) == "batch_1"
+    lines = mock_openai.files.create.call_args[1]["file"][1].decode().splitlines()
+    assert [json.loads(line)["body"]["messages"][-1]["content"] for line in lines] == ["first message", "second message"]
+
+    output = "\n".join(json.dumps({
+        "custom_id": f"request-{i}",
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": f"answer {i}"}}]}},
+        "error": None,
+    }) for i in (1, 0))
+    mock_openai.batches.retrieve.return_value = Mock(
+        id="batch_1", status="completed", output_file_id="file_2", request_counts=Mock(total=2)
+    )
+    mock_openai.files.content.return_value = Mock(text=output)
+    # Results come back in prompt order, whatever the order of the output file
+    assert agent.fetch_batch("batch_1") == ["answer 0", "answer 1"]
+
+def test_iter_sse_content():
+    lines = [": keep-alive", ""] + make_sse_lines(
+        delta_event("Hel"),
+        json.dumps({"choices": [], "usage": {"total_tokens": 3}}),  # No choices, skipped
+        json.dumps({"choices": [{"index": 0, "delta": {"role": "assistant"}}]}),  # No content
+        delta_event("lo"),
+        "[DONE]",
+        delta_event("after done"),
+    )
+    assert list(_iter_sse_content(lines)) == ["Hel", "lo"]
+
+def test_iter_sse_content_error_event():
+    lines = make_sse_lines(delta_event("Hel"), json.dumps({"error": {"message": "Overloaded"}}))
+    contents = _iter_sse_content(lines)
+    assert next(contents) == "Hel"
+    with pytest.raises(APIError, match="Overloaded"):
+        next(contents)
+
+def test_stream_response(mock_openai):
+    agent = Agent("test prompt")
+    response = StreamResponseStub(make_sse_lines(delta_event("Hel"), delta_event("lo"), "[DONE]"))
+
+    assert list(agent._stream_response(response)) == ["Hel", "lo"]
+    assert agent.messages[-1] == {"role": "assistant", "content": "Hello"}
+    assert response.closed
+
+def test_stream_response_error_event(mock_openai):
+    agent = Agent("test prompt")
+    response = StreamResponseStub(make_sse_lines(delta_event("Hel"), json.dumps({"error": "Overloaded"})))
+
+    with pytest.raises(APIError):
+        list(agent._stream_response(response))
+    # The partial answer is not kept as if it was complete
+    assert len(agent.messages) == 1
+    assert response.closed
+
+def test_agent_request_stream(mock_openai):
+    response = StreamResponseStub(make_sse_lines(delta_event("Hello"), "[DONE]"))
+    mock_openai.chat.completions.with_streaming_response.create.return_value = MagicMock(
+        **{"__enter__.return_value": response}
+    )
+
+    agent = Agent("test prompt")
+    assert list(agent.request("test message", stream=True)) == ["Hello"]
+
+def test_agent_request_stream_http_error(mock_openai):
+    streaming_response = MagicMock()
+    streaming_response.__enter__.side_effect = Exception("Unauthorized")
+    mock_openai.chat.completions.with_streaming_response.create.return_value = streaming_response
+
+    agent = Agent("test prompt")
+    # The request is sent by request() itself, so the error is reported like any other
+    assert agent.request("test message", stream=True) == "Error: Unauthorized"
+
+def test_batch_chunks_size_threshold():
+    chunks = batch_chunks(iter(["ab", "cd", "ef", "g"]), batch_chars=4, batch_ms=10_000)
+    assert list(chunks) == ["abcd", "efg"]
+
+def test_batch_chunks_time_threshold():
+    # Token arrival times in seconds, the first chunk is due 50ms after "a"
+    with patch('joao._chunks.time.monotonic', side_effect=[0, 0.01, 0.06, 0.07]):
+        chunks = list(batch_chunks(iter("abcd"), batch_chars=100, batch_ms=50))
+    assert chunks == ["abc", "d"]
+
+@pytest.mark.asyncio
+async def test_abatch_chunks():
+    async def tokens():
+        for token in ["ab", "cd", "ef", "g"]:
+            yield token
+
+    assert [chunk async for chunk in abatch_chunks(tokens(), batch_chars=4, batch_ms=10_000)] == ["abcd", "efg"]
+
+def test_agent_stream(mock_openai):
+    response = StreamResponseStub(make_sse_lines(*map(delta_event, ["He", "ll", "o ", "wo", "rld"]), "[DONE]"))
+    mock_openai.chat.completions.with_streaming_response.create.return_value = MagicMock(
+        **{"__enter__.return_value": response}
+    )
+
+    agent = Agent("test prompt")
+    assert list(agent.stream("test message", batch_chars=4, batch_ms=10_000)) == ["Hell", "o wo", "rld"]
+
+def test_agent_stream_error_event(mock_openai):
+    response = StreamResponseStub(make_sse_lines(delta_event("Hello"), json.dumps({"error": "Overloaded"})))
+    mock_openai.chat.completions.with_streaming_response.create.return_value = MagicMock(
+        **{"__enter__.return_value": response}
+    )
+
+    agent = Agent("test prompt")
+    chunks = list(agent.stream("test message", batch_chars=4, batch_ms=10_000))
+    # The text received before the error is kept, then the error is reported
+    assert chunks[0] == "Hello"
+    assert chunks[1].startswith("Error: ")
+
+@pytest.fixture
+def openai_endpoint(monkeypatch):
+    """Point new agents at api.openai.com, where the Responses API can be used"""
+    monkeypatch.setenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+def test_responses_api_is_opt_in(mock_openai, openai_endpoint):
+    agent = Agent("test prompt")
+    assert agent.request("test message") == "Hello, I'm a mock response"
+    assert mock_openai.responses.create.call_count == 0
+
+def test_responses_api_first_turn(mock_openai, openai_endpoint):
+    mock_openai.responses.create.return_value = Mock(id="resp_1", output_text="First answer")
+
+    agent = Agent("test prompt", responses_api=True)
+    assert agent.request("test message") == "First answer"
+
+    call_kwargs = mock_openai.responses.create.call_args[1]
+    assert call_kwargs["input"] == "test message"
+    assert call_kwargs["instructions"] == "test prompt"
+    assert "previous_response_id" not in call_kwargs
+    assert mock_openai.chat.completions.create.call_count == 0
+    # The local history stays complete
+    assert agent.messages[-2:] == [
+        {"role": "user", "content": "test message"},
+        {"role": "assistant", "content": "First answer"},
+    ]
+
+def test_responses_api_chains_turns(mock_openai, openai_endpoint):
+    mock_openai.responses.create.side_effect = [
+        Mock(id="resp_1", output_text="First answer"),
+        Mock(id="resp_2", output_text="Second answer"),
+    ]
+
+    agent = Agent("test prompt", responses_api=True)
+    agent.request("first message")
+    assert agent.request("second message") == "Second answer"
+
+    call_kwargs = mock_openai.responses.create.call_args[1]
+    assert call_kwargs["input"] == "second message"  # Only the new message is sent
+    assert call_kwargs["previous_response_id"] == "resp_1"
+
+def test_responses_api_new_chain_after_trim(mock_openai, openai_endpoint):
+    mock_openai.responses.create.side_effect = [
+        Mock(id=f"resp_{i}", output_text=f"answer {i}") for i in range(3)
+    ]
+
+    agent = Agent("test prompt", responses_api=True, max_history_messages=4)
+    for i in range(3):
+        agent.request(f"question {i}")
+
+    # The third turn drops the first one, the server side conversation starts over
+    # from what the local history kept
+    call_kwargs = mock_openai.responses.create.call_args[1]
+    assert "previous_response_id" not in call_kwargs
+    assert call_kwargs["input"] == _conversation(3)[2:5]
+
+def test_responses_api_falls_back_after_tools(mock_openai, openai_endpoint):
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    mock_openai.responses.create.return_value = Mock(id="resp_1", output_text="First answer")
+
+    agent = Agent("test prompt", responses_api=True)
+    agent.request("first message")
+    agent.request("second message", tools=[test_tool])
+    agent.request("third message")
+
+    # The server side conversation misses the tools turn, chat completions are used from then on
+    assert mock_openai.responses.create.call_count == 1
+    assert mock_openai.chat.completions.create.call_count == 2
+    assert len(mock_openai.chat.completions.create.call_args[1]["messages"]) == 7
+
+def test_responses_api_falls_back_after_stream(mock_openai, openai_endpoint):
+    response = StreamResponseStub(make_sse_lines(delta_event("Hello"), "[DONE]"))
+    mock_openai.chat.completions.with_streaming_response.create.return_value = MagicMock(
+        **{"__enter__.return_value": response}
+    )
+
+    agent = Agent("test prompt", responses_api=True)
+    assert list(agent.request("first message", stream=True)) == ["Hello"]
+    agent.request("second message")
+
+    assert mock_openai.responses.create.call_count == 0
+    assert mock_openai.chat.completions.create.call_count == 1
+
+def test_responses_api_reenabled_by_reset(mock_openai, openai_endpoint):
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    mock_openai.responses.create.side_effect = [
+        Mock(id="resp_1", output_text="First answer"),
+        Mock(id="resp_2", output_text="New conversation"),
+    ]
+
+    agent = Agent("test prompt", responses_api=True)
+    agent.request("first message")
+    agent.request("second message", tools=[test_tool])
+    agent.reset()
+    assert agent.request("third message") == "New conversation"
+
+    # A new server side conversation is started
+    assert "previous_response_id" not in mock_openai.responses.create.call_args[1]
+
 def test_agent_request_with_tools(mock_openai):
     def test_tool(param: str):
         """Test tool"""
@@ -86,32 +391,13 @@ def test_agent_request_with_auto_tool_execution(mock_openai):
         return f"Tool called with {param}"
     
     # Set up mock response with tool calls
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     # First response with tool call
-    mock_message1 = Mock()
-    mock_message1.content = "Using tool..."
-    mock_message1.tool_calls = [mock_tool_call]
-    
-    mock_choice1 = Mock()
-    mock_choice1.message = mock_message1
-    
-    mock_response1 = Mock()
-    mock_response1.choices = [mock_choice1]
+    mock_response1 = make_response("Using tool...", [mock_tool_call])
     
     # Second response after tool execution
-    mock_message2 = Mock()
-    mock_message2.content = "Tool execution complete"
-    mock_message2.tool_calls = None
-    
-    mock_choice2 = Mock()
-    mock_choice2.message = mock_message2
-    
-    mock_response2 = Mock()
-    mock_response2.choices = [mock_choice2]
+    mock_response2 = make_response("Tool execution complete")
     
     # Set up sequence of responses
     mock_openai.chat.completions.create.side_effect = [mock_response1, mock_response2]
@@ -128,20 +414,9 @@ def test_agent_request_no_auto_tool_execution(mock_openai):
         return f"Tool called with {param}"
     
     # Set up mock response with tool calls
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
-    mock_message = Mock()
-    mock_message.content = "Using tool..."
-    mock_message.tool_calls = [mock_tool_call]
-    
-    mock_choice = Mock()
-    mock_choice.message = mock_message
-    
-    mock_response = Mock()
-    mock_response.choices = [mock_choice]
+    mock_response = make_response("Using tool...", [mock_tool_call])
     
     mock_openai.chat.completions.create.return_value = mock_response
     
@@ -160,10 +435,7 @@ def test_use_tools_without_auto_update(mock_openai):
     agent.tools_handler.set_tools([test_tool])
     
     # Set up a mock tool call
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     agent.tools_handler.set_tool_calls([mock_tool_call])
     result = agent.use_tools(auto_update=False)
@@ -180,10 +452,7 @@ def test_use_tools_with_auto_update(mock_openai):
     agent.tools_handler.set_tools([test_tool])
     
     # Set up a mock tool call
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     agent.tools_handler.set_tool_calls([mock_tool_call])
     result = agent.use_tools(auto_update=True)
@@ -191,6 +460,53 @@ def test_use_tools_with_auto_update(mock_openai):
     assert result == "Hello, I'm a mock response"  # From the completion after tool execution
     assert mock_openai.chat.completions.create.call_count == 1
 
+def test_agent_tool_results_follow_their_call(mock_openai):
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    sent = []
+    responses = [
+        make_response(None, [
+            make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+            make_tool_call("test_tool", '{"param": "b"}', id="call_2"),
+        ]),
+        make_response("Tool execution complete"),
+    ]
+    def create(**kwargs):
+        sent.append(list(kwargs["messages"]))
+        return responses.pop(0)
+    mock_openai.chat.completions.create.side_effect = create
+
+    agent = Agent("test prompt")
+    assert agent.request("test message", tools=[test_tool], auto_use_tools=True) == "Tool execution complete"
+
+    # One assistant message with both calls, directly followed by their results
+    history = sent[1]
+    assert [message["role"] for message in history] == ["system", "user", "assistant", "tool", "tool"]
+    assert [call["id"] for call in history[2]["tool_calls"]] == ["call_1", "call_2"]
+    assert [(message["tool_call_id"], message["content"]) for message in history[3:]] == [
+        ("call_1", "Tool called with a"), ("call_2", "Tool called with b")
+    ]
+
+def test_agent_serial_tool_calls(mock_openai):
+    threads = []
+    def test_tool(param: str):
+        """Test tool"""
+        threads.append(threading.get_ident())
+        return f"Tool called with {param}"
+
+    agent = Agent("test prompt", concurrent_tool_calls=False)
+    agent.tools_handler.set_tools([test_tool])
+    agent.tools_handler.set_tool_calls([
+        make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+        make_tool_call("test_tool", '{"param": "b"}', id="call_2"),
+    ])
+    agent.use_tools(auto_update=True)
+
+    # Tools that are not thread safe run on the caller's thread
+    assert threads == [threading.get_ident()] * 2
+
 # Async Agent Tests
 @pytest.mark.asyncio
 async def test_async_agent_initialization():
@@ -209,6 +525,85 @@ async def test_async_agent_request_without_tools(mock_async_openai):
     assert agent.messages[1]["role"] == "user"
     assert agent.messages[1]["content"] == "test message"
 
+@pytest.mark.asyncio
+async def test_async_agent_stream(mock_async_openai):
+    async def tokens():
+        for token in ["He", "ll", "o ", "wo", "rld"]:
+            yield token
+
+    agent = AsyncAgent("test prompt")
+    with patch.object(agent, "request", new=AsyncMock(return_value=tokens())):
+        chunks = [chunk async for chunk in agent.stream("test message", batch_chars=4, batch_ms=10_000)]
+    assert chunks == ["Hell", "o wo", "rld"]
+
+@pytest.fixture
+def concurrency_limit():
+    yield configure_concurrency
+    configure_concurrency(DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+@pytest.mark.asyncio
+async def test_async_agent_concurrency_limit(mock_async_openai, concurrency_limit):
+    concurrency_limit(2)
+    in_flight = []
+    peak = []
+
+    async def async_create(**kwargs):
+        in_flight.append(None)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return make_response("Hello, I'm a mock response")
+
+    mock_async_openai.chat.completions.create = async_create
+
+    # Separate agents still share the limit
+    agents = [AsyncAgent("test prompt") for _ in range(5)]
+    responses = await asyncio.gather(*(agent.request("test message") for agent in agents))
+
+    assert responses == ["Hello, I'm a mock response"] * 5
+    assert max(peak) == 2
+
+def test_configure_concurrency_rejects_zero():
+    with pytest.raises(ValueError):
+        configure_concurrency(0)
+
+def test_request_semaphore_per_event_loop():
+    async def semaphores():
+        return _request_semaphore(), _request_semaphore()
+
+    first, again = asyncio.run(semaphores())
+    other, _ = asyncio.run(semaphores())
+    # Reused within a loop, a new loop gets its own
+    assert first is again
+    assert other is not first
+
+@pytest.mark.asyncio
+async def test_async_agent_rate_limit_backoff(mock_async_openai):
+    mock_async_openai.chat.completions.create = AsyncMock(side_effect=[
+        make_rate_limit_error(),
+        make_rate_limit_error(),
+        make_response("Hello, I'm a mock response"),
+    ])
+
+    with patch('joao.async_agent.asyncio.sleep', new=AsyncMock()) as sleep:
+        response = await AsyncAgent("test prompt").request("test message")
+
+    assert response == "Hello, I'm a mock response"
+    assert mock_async_openai.chat.completions.create.await_count == 3
+    # Exponential delays, 1s then 2s, plus up to a second of jitter
+    delays = [call[0][0] for call in sleep.await_args_list]
+    assert 1 <= delays[0] < 2
+    assert 2 <= delays[1] < 3
+
+@pytest.mark.asyncio
+async def test_async_agent_rate_limit_gives_up(mock_async_openai):
+    mock_async_openai.chat.completions.create = AsyncMock(side_effect=make_rate_limit_error())
+
+    with patch('joao.async_agent.asyncio.sleep', new=AsyncMock()):
+        with pytest.raises(RateLimitError):
+            await AsyncAgent("test prompt").request("test message")
+    assert mock_async_openai.chat.completions.create.await_count == MAX_RATE_LIMIT_RETRIES
+
 @pytest.mark.asyncio
 async def test_async_agent_request_with_tools(mock_async_openai):
     async def test_tool(param: str):
@@ -216,15 +611,7 @@ async def test_async_agent_request_with_tools(mock_async_openai):
         return f"Tool called with {param}"
     
     # Set up mock response
-    mock_message = Mock()
-    mock_message.content = "Using tool..."
-    mock_message.tool_calls = None
-    
-    mock_choice = Mock()
-    mock_choice.message = mock_message
-    
-    mock_response = Mock()
-    mock_response.choices = [mock_choice]
+    mock_response = make_response("Using tool...")
     
     async def async_create(**kwargs):
         return mock_response
@@ -243,32 +630,13 @@ async def test_async_agent_request_with_auto_tool_execution(mock_async_openai):
         return f"Tool called with {param}"
     
     # Set up mock response with tool calls
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     # First response with tool call
-    mock_message1 = Mock()
-    mock_message1.content = "Using tool..."
-    mock_message1.tool_calls = [mock_tool_call]
-    
-    mock_choice1 = Mock()
-    mock_choice1.message = mock_message1
-    
-    mock_response1 = Mock()
-    mock_response1.choices = [mock_choice1]
+    mock_response1 = make_response("Using tool...", [mock_tool_call])
     
     # Second response after tool execution
-    mock_message2 = Mock()
-    mock_message2.content = "Tool execution complete"
-    mock_message2.tool_calls = None
-    
-    mock_choice2 = Mock()
-    mock_choice2.message = mock_message2
-    
-    mock_response2 = Mock()
-    mock_response2.choices = [mock_choice2]
+    mock_response2 = make_response("Tool execution complete")
     
     # Set up sequence of responses
     responses = [mock_response1, mock_response2]
@@ -282,6 +650,39 @@ async def test_async_agent_request_with_auto_tool_execution(mock_async_openai):
     
     assert response == "Tool execution complete"
 
+@pytest.mark.asyncio
+async def test_async_agent_tool_results_follow_their_call(mock_async_openai):
+    async def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    responses = [
+        make_response(None, [
+            make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+            make_tool_call("test_tool", '{"param": "b"}', id="call_2"),
+        ]),
+        make_response("Tool execution complete"),
+    ]
+    sent = []
+    async def async_create(**kwargs):
+        sent.append(list(kwargs["messages"]))
+        return responses.pop(0)
+
+    mock_async_openai.chat.completions.create = async_create
+
+    agent = AsyncAgent("test prompt")
+    assert await agent.request("test message", tools=[test_tool], auto_use_tools=True) == "Tool execution complete"
+
+    # One assistant message with both calls, directly followed by their results
+    history = sent[1]
+    assert [getattr(message, "role", None) or message["role"] for message in history] == [
+        "system", "user", "assistant", "tool", "tool"
+    ]
+    assert [call.id for call in history[2].tool_calls] == ["call_1", "call_2"]
+    assert [(message["tool_call_id"], message["content"]) for message in history[3:]] == [
+        ("call_1", "Tool called with a"), ("call_2", "Tool called with b")
+    ]
+
 @pytest.mark.asyncio
 async def test_async_use_tools_without_auto_update(mock_async_openai):
     async def test_tool(param: str):
@@ -292,10 +693,7 @@ async def test_async_use_tools_without_auto_update(mock_async_openai):
     agent.tools_handler.set_tools([test_tool])
     
     # Set up a mock tool call
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     agent.tools_handler.set_tool_calls([mock_tool_call])
     result = await agent.use_tools(auto_update=False)
@@ -309,15 +707,7 @@ async def test_async_use_tools_with_auto_update(mock_async_openai):
         return f"Tool called with {param}"
     
     # Set up mock response
-    mock_message = Mock()
-    mock_message.content = "Tool execution complete"
-    mock_message.tool_calls = None
-    
-    mock_choice = Mock()
-    mock_choice.message = mock_message
-    
-    mock_response = Mock()
-    mock_response.choices = [mock_choice]
+    mock_response = make_response("Tool execution complete")
     
     async def async_create(**kwargs):
         return mock_response
@@ -328,10 +718,7 @@ async def test_async_use_tools_with_auto_update(mock_async_openai):
     agent.tools_handler.set_tools([test_tool])
     
     # Set up a mock tool call
-    mock_tool_call = Mock()
-    mock_tool_call.id = "call_1"
-    mock_tool_call.function.name = "test_tool"
-    mock_tool_call.function.arguments = '{"param": "test value"}'
+    mock_tool_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     agent.tools_handler.set_tool_calls([mock_tool_call])
     result = await agent.use_tools(auto_update=True)
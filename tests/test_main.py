@@ -0,0 +1,75 @@
+import io
+from itertools import count
+from unittest.mock import patch
+from rich.console import Console
+from joao.__main__ import split_blocks, _rich_stream, clear_screen, REFRESH_INTERVAL
+
+MARKDOWN = (
+    "# Title\n\n"
+    "```python\nx = 1\n\ny = 2\n```\n\n"
+    "- one\n- two\n\n"
+    "| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+    "Unfinished para"
+)
+
+def test_split_blocks():
+    blocks, tail = split_blocks(MARKDOWN)
+
+    assert blocks == [
+        "# Title\n\n",
+        "```python\nx = 1\n\ny = 2\n```\n\n",  # Blank lines inside the fence don't split it
+        "- one\n- two\n\n",
+        "| a | b |\n|---|---|\n| 1 | 2 |\n\n",
+    ]
+    assert MARKDOWN[tail:] == "Unfinished para"
+
+def test_split_blocks_single_block():
+    assert split_blocks("Only one paragraph\nstill going") == ([], 0)
+    assert split_blocks("") == ([], 0)
+
+def test_split_blocks_open_code_fence():
+    # An unclosed fence runs to the end, so it stays in the tail
+    text = "Intro\n\n```\ncode\n\nmore code\n"
+    blocks, tail = split_blocks(text)
+    assert blocks == ["Intro\n\n"]
+    assert text[tail:] == "```\ncode\n\nmore code\n"
+
+def test_split_blocks_carriage_returns():
+    blocks, tail = split_blocks("a\rb\n\nc\n\nd")
+    assert blocks == ["a\rb\n\n", "c\n\n"]
+    assert tail == len("a\rb\n\nc\n\n")
+
+    text = "a\r\nb\r\n\r\nc"
+    blocks, tail = split_blocks(text)
+    assert blocks == ["a\r\nb\r\n\r\n"]
+    assert text[tail:] == "c"
+
+def _render(chunks):
+    """Stream chunks through _rich_stream, each one arriving a refresh interval after the last"""
+    output = io.StringIO()
+    console = Console(file=output, width=80, color_system=None)
+    clock = count(step=REFRESH_INTERVAL)
+    with patch('joao.__main__.time.monotonic', side_effect=lambda: next(clock)):
+        _rich_stream(iter(chunks), console)
+    return output.getvalue()
+
+def test_rich_stream():
+    chunks = [MARKDOWN[i:i + 7] for i in range(0, len(MARKDOWN), 7)]
+    output = _render(chunks)
+
+    # Every block is printed once, even though the tail was re-rendered on every tick
+    for text in ("Title", "x = 1", "y = 2", "one", "two"):
+        assert output.count(text) == 1
+    assert "Unfinished para" in output
+
+def test_rich_stream_carriage_returns():
+    # A \r\n split between chunks must not turn into a blank line
+    output = _render(["first line\r", "\nsame paragraph\r\n\r\n", "second\rparagraph"])
+
+    assert "first line same paragraph" in output
+    assert "second paragraph" in output
+
+def test_clear_screen():
+    with patch('joao.__main__.console') as console:
+        clear_screen()
+    console.clear.assert_called_once_with()
@@ -1,6 +1,8 @@
+import inspect
 import pytest
-from unittest.mock import Mock
+from typing import List, Dict
 from joao.tools import ToolsHandler, AsyncToolsHandler
+from ._helpers import make_tool_call
 
 def test_tools_handler_initialization():
     handler = ToolsHandler()
@@ -44,6 +46,79 @@ def test_create_tool_def():
     assert "optional" in tool_def["function"]["parameters"]["properties"]
     assert tool_def["function"]["parameters"]["required"] == ["param"]
 
+def test_create_tool_def_parameter_types():
+    def test_tool(count: int, ratio: float, enabled: bool, items: list, options: dict, name, other: "int",
+                  numbers: List[int], mapping: Dict[str, int]):
+        """Test tool"""
+
+    handler = ToolsHandler()
+    properties = handler.create_tool_def(test_tool)["function"]["parameters"]["properties"]
+
+    assert properties["count"] == {"type": "integer"}
+    assert properties["ratio"] == {"type": "number"}
+    assert properties["enabled"] == {"type": "boolean"}
+    assert properties["items"] == {"type": "array", "items": {"type": "string"}}
+    assert properties["numbers"] == {"type": "array", "items": {"type": "integer"}}
+    assert properties["mapping"] == {"type": "object"}
+    assert properties["options"] == {"type": "object"}
+    assert properties["name"] == {"type": "string"}  # Unannotated
+    assert properties["other"] == {"type": "integer"}  # Postponed annotation
+
+def test_create_tool_def_bound_method():
+    def with_signature(function):
+        # Like decorators that set __signature__ on the function they return
+        function.__signature__ = inspect.signature(function)
+        return function
+
+    class Weather:
+        @with_signature
+        def forecast(self, city: str, days: int = 1):
+            """Get the forecast"""
+
+    parameters = ToolsHandler().create_tool_def(Weather().forecast)["function"]["parameters"]
+    assert list(parameters["properties"]) == ["city", "days"]
+    assert parameters["required"] == ["city"]
+
+def test_create_tool_def_is_cached():
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+    
+    handler = ToolsHandler()
+    tool_def = handler.create_tool_def(test_tool)
+    # The definition is built once per callable, callers get their own copy
+    tool_def["function"]["parameters"]["properties"]["param"]["type"] = "integer"
+    assert ToolsHandler().create_tool_def(test_tool)["function"]["parameters"]["properties"]["param"] == {"type": "string"}
+    handler.set_tools([test_tool])
+    assert handler.get_tools_definitions()[0]["function"]["parameters"]["properties"]["param"] == {"type": "string"}
+
+def test_set_tools_reuses_definitions():
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    handler = ToolsHandler()
+    handler.set_tools([test_tool])
+    definitions = handler.get_tools_definitions()
+    # Passing the same tools again on the next turn keeps the built list
+    handler.set_tools([test_tool])
+    assert handler.get_tools_definitions() is definitions
+
+def test_get_tools_digest():
+    def test_tool(param: str):
+        """Test tool"""
+        return f"Tool called with {param}"
+
+    def other_tool(param: int):
+        """Other tool"""
+
+    handler = ToolsHandler()
+    handler.set_tools([test_tool])
+    digest = handler.get_tools_digest()
+    assert handler.get_tools_digest() == digest
+    handler.set_tools([other_tool])
+    assert handler.get_tools_digest() != digest
+
 def test_async_create_tool_def():
     def test_tool(param: str, optional: str = "default"):
         """Test tool description"""
@@ -66,9 +141,7 @@ def test_execute_tool_calls():
     handler = ToolsHandler()
     handler.set_tools([test_tool])
     
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test value"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     handler.set_tool_calls([mock_call])
     results = handler.execute_tool_calls()
@@ -87,9 +160,7 @@ async def test_async_execute_tool_calls():
     handler = AsyncToolsHandler()
     handler.set_tools([test_tool])
     
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test value"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     handler.set_tool_calls([mock_call])
     results = await handler.execute_tool_calls()
@@ -99,6 +170,64 @@ async def test_async_execute_tool_calls():
     assert len(results) == 1
     assert results[0] == "Tool called with test value"
 
+def test_run_tool_calls_runs_duplicates():
+    calls = []
+    def test_tool(param: str):
+        """Test tool"""
+        calls.append(param)
+        return f"Tool called with {param}"
+
+    handler = ToolsHandler()
+    handler.set_tools([test_tool])
+
+    responses = handler.run_tool_calls([
+        make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+        make_tool_call("test_tool", '{"param": "a"}', id="call_2"),
+    ])
+
+    # Tools may have side effects, by default a repeated call runs again
+    assert responses == ["Tool called with a", "Tool called with a"]
+    assert calls == ["a", "a"]
+
+def test_run_tool_calls_dedupe_runs_duplicates_once():
+    calls = []
+    def test_tool(param: str):
+        """Test tool"""
+        calls.append(param)
+        return f"Tool called with {param}"
+
+    handler = ToolsHandler(dedupe_calls=True)
+    handler.set_tools([test_tool])
+
+    responses = handler.run_tool_calls([
+        make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+        make_tool_call("test_tool", '{"param": "b"}', id="call_2"),
+        make_tool_call("test_tool", '{"param": "a"}', id="call_3"),
+    ])
+
+    # Every call gets its response, but identical calls only ran once
+    assert responses == ["Tool called with a", "Tool called with b", "Tool called with a"]
+    assert sorted(calls) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_async_run_tool_calls_dedupe():
+    calls = []
+    async def test_tool(param: str):
+        """Test tool"""
+        calls.append(param)
+        return f"Tool called with {param}"
+
+    tool_calls = [
+        make_tool_call("test_tool", '{"param": "a"}', id="call_1"),
+        make_tool_call("test_tool", '{"param": "a"}', id="call_2"),
+    ]
+    for dedupe_calls, expected_calls in ((False, ["a", "a"]), (True, ["a"])):
+        calls.clear()
+        handler = AsyncToolsHandler(dedupe_calls=dedupe_calls)
+        handler.set_tools([test_tool])
+        assert await handler.run_tool_calls(tool_calls) == ["Tool called with a"] * 2
+        assert calls == expected_calls
+
 def test_sync_handler_with_async_tool():
     async def test_tool(param: str):
         """Test tool"""
@@ -107,9 +236,7 @@ def test_sync_handler_with_async_tool():
     handler = ToolsHandler()
     handler.set_tools([test_tool])
     
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test value"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     handler.set_tool_calls([mock_call])
     
@@ -126,9 +253,7 @@ async def test_async_handler_with_sync_tool():
     handler = AsyncToolsHandler()
     handler.set_tools([test_tool])
     
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test value"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test value"}')
     
     handler.set_tool_calls([mock_call])
     
@@ -143,9 +268,7 @@ def test_has_pending_calls():
     assert not handler.has_pending_calls()
     
     # Test with a call
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test"}')
     
     handler.set_tool_calls([mock_call])
     assert handler.has_pending_calls()
@@ -162,9 +285,7 @@ async def test_async_has_pending_calls():
     assert not handler.has_pending_calls()
     
     # Test with a call
-    mock_call = Mock()
-    mock_call.function.name = "test_tool"
-    mock_call.function.arguments = '{"param": "test"}'
+    mock_call = make_tool_call("test_tool", '{"param": "test"}')
     
     handler.set_tool_calls([mock_call])
     assert handler.has_pending_calls()
@@ -172,3 +293,12 @@ async def test_async_has_pending_calls():
     # Test after executing calls
     handler.clear_tool_calls()
     assert not handler.has_pending_calls()
+
+def test_get_last_tool_calls():
+    handler = ToolsHandler()
+    first_call = make_tool_call("test_tool", '{"param": "a"}', id="call_1")
+
+    handler.set_tool_calls([first_call])
+    handler.set_tool_calls([make_tool_call("test_tool", '{"param": "b"}', id="call_2")])
+    # The previous batch is kept without having to ask for it beforehand
+    assert handler.get_last_tool_calls() == [first_call]